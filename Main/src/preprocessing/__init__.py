@@ -0,0 +1 @@
+"""Loading, cleaning and merging of the multimodal ADNI tables."""
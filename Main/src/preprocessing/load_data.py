@@ -0,0 +1,308 @@
+"""
+Typed, out-of-core loading of ADNI merge tables (e.g. ADNI_MERGE_FINAL_with_RAW_DX.csv).
+
+Plain ``pd.read_csv`` infers object columns and float64 for everything and holds
+the whole file in memory while parsing. ``load_adni_table`` instead:
+  - drops ID/date columns (RID, PTID, EXAMDATE, ...) unless they are requested,
+  - reads only the needed columns, in chunks,
+  - applies a declared schema (categoricals, float32, small nullable ints),
+  - never turns a value into NaN silently: an inferred numeric column that turns out to
+    hold text further down the file is widened to a categorical (with a warning), and
+    a declared column whose values do not parse raises SchemaCoercionError,
+  - keeps a binary (pickle) cache next to the CSV, invalidated when the CSV changes.
+
+Usage:
+  python -m src.preprocessing.load_data path/to/ADNI_MERGE_FINAL_with_RAW_DX.csv [--compare]
+(run from the Main directory). ``--compare`` reports load time and peak memory
+against plain ``pd.read_csv``.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+import tracemalloc
+import warnings
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# ID / bookkeeping columns the training notebooks drop before fitting
+ID_COLUMNS = [
+    'RID', 'PTID', 'RID.1', 'ID', 'SITEID', 'USERDATE2', 'EXAMDATE', 'EXAMDATE_bl',
+    'APTESTDT', 'update_stamp',
+]
+
+# Parsed as datetimes when they are explicitly kept
+DATE_COLUMNS = ['EXAMDATE', 'EXAMDATE_bl', 'USERDATE2', 'APTESTDT', 'update_stamp']
+
+# Declared dtypes for known ADNIMERGE columns; anything else numeric becomes float32
+# and anything else non-numeric becomes a categorical.
+ADNI_SCHEMA = {
+    'RID': 'Int32',
+    'RID.1': 'Int32',
+    'SITEID': 'Int16',
+    'PTID': 'category',
+    'VISCODE': 'category',
+    'SITE': 'category',
+    'COLPROT': 'category',
+    'ORIGPROT': 'category',
+    'DX': 'category',
+    'DX_bl': 'category',
+    'PTGENDER': 'category',
+    'PTETHCAT': 'category',
+    'PTRACCAT': 'category',
+    'PTMARRY': 'category',
+    'FLDSTRENG': 'category',
+    'FSVERSION': 'category',
+    'APOE4': 'Int8',
+    'PTEDUCAT': 'Int8',
+    'Month_bl': 'float32',
+    'Years_bl': 'float32',
+    # Censored CSF biomarkers: out-of-range assay results are exported as text
+    # ('>1700', '<200', '<8'), so they are kept verbatim instead of as floats
+    'ABETA': 'category',
+    'ABETA_bl': 'category',
+    'TAU': 'category',
+    'TAU_bl': 'category',
+    'PTAU': 'category',
+    'PTAU_bl': 'category',
+}
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+class SchemaCoercionError(ValueError):
+    """Values of a declared column that do not parse as its dtype (they would become NaN)"""
+
+
+class _WidenColumn(Exception):
+    """An inferred numeric column holds values that only fit a categorical"""
+
+    def __init__(self, column, lost, examples):
+        super().__init__(column)
+        self.column = column
+        self.lost = lost
+        self.examples = examples
+
+
+def infer_schema(path, columns=None, sample_rows=5000, overrides=None):
+    """Build a column -> dtype map from ADNI_SCHEMA plus a small sample of the file"""
+    sample = pd.read_csv(path, nrows=sample_rows, usecols=columns, low_memory=False)
+    schema = {}
+    declared = dict(ADNI_SCHEMA, **(overrides or {}))
+    for col in sample.columns:
+        if col in declared:
+            schema[col] = declared[col]
+        elif col in DATE_COLUMNS:
+            schema[col] = 'datetime64[ns]'
+        elif pd.api.types.is_bool_dtype(sample[col]):
+            schema[col] = 'Int8'
+        elif pd.api.types.is_numeric_dtype(sample[col]):
+            schema[col] = 'float32'
+        else:
+            schema[col] = 'category'
+    return schema
+
+
+def select_columns(path, columns=None, keep_columns=()):
+    """Columns to read: the requested ones, or every column minus the ID columns not kept"""
+    header = pd.read_csv(path, nrows=0).columns.tolist()
+    if columns is not None:
+        missing = [c for c in columns if c not in header]
+        if missing:
+            raise KeyError(f"Columns not in {os.path.basename(path)}: {missing}")
+        wanted = list(columns)
+    else:
+        wanted = [c for c in header if c not in ID_COLUMNS]
+    for col in keep_columns:
+        if col in header and col not in wanted:
+            wanted.append(col)
+    # Preserve file order so the result lines up with the CSV
+    return [c for c in header if c in wanted]
+
+
+def _coercion_losses(raw, coerced):
+    """Number of values present in the raw column but missing after coercion, and a few of them"""
+    lost = raw.notna().to_numpy() & coerced.isna().to_numpy()
+    count = int(lost.sum())
+    return count, (raw[lost].astype(str).unique()[:5].tolist() if count else [])
+
+
+def apply_schema(chunk, schema, declared=()):
+    """
+    Coerce one raw chunk to the schema's dtypes. Values that would be lost to NaN raise
+    SchemaCoercionError for declared columns and _WidenColumn for inferred ones.
+    """
+    out = {}
+    for col in chunk.columns:
+        dtype = schema.get(col, 'float32')
+        values = chunk[col]
+        if dtype == 'category':
+            out[col] = values if isinstance(values.dtype, pd.CategoricalDtype) else values.astype('category')
+            continue
+        if dtype.startswith('datetime'):
+            coerced = pd.to_datetime(values, errors='coerce')
+        else:
+            coerced = pd.to_numeric(values, errors='coerce')
+        lost, examples = _coercion_losses(values, coerced)
+        if lost and col in declared:
+            raise SchemaCoercionError(f"{col}: {lost} value(s) do not parse as {dtype} (e.g. {examples}); "
+                                      f"declare it in schema_overrides")
+        if lost:
+            raise _WidenColumn(col, lost, examples)
+        if dtype.startswith('datetime'):
+            out[col] = coerced
+        elif dtype.startswith('Int'):
+            try:
+                out[col] = coerced.astype(dtype)
+            except (TypeError, ValueError):
+                # Non-integral values: fall back to a compact float
+                out[col] = coerced.astype('float32')
+        else:
+            out[col] = coerced.astype(dtype)
+    return pd.DataFrame(out, index=chunk.index)
+
+
+def concat_chunks(chunks, schema):
+    """Concatenate typed chunks, unifying categoricals so they stay categorical"""
+    if not chunks:
+        return pd.DataFrame(columns=list(schema))
+    if len(chunks) == 1:
+        return chunks[0].reset_index(drop=True)
+    columns = {}
+    for col in chunks[0].columns:
+        parts = [c[col] for c in chunks]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            columns[col] = pd.Series(union_categoricals(parts, ignore_order=True), name=col)
+        else:
+            columns[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def _cache_path(path, usecols, schema, cache_dir):
+    """Cache file keyed on the CSV's size/mtime and the requested columns and schema"""
+    stat = os.stat(path)
+    key = json.dumps({
+        "file": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "columns": usecols,
+        "schema": schema,
+    }, sort_keys=True)
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), '.cache')
+    base = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{base}.{digest}.pkl")
+
+
+def load_adni_table(path, columns=None, keep_columns=(), schema_overrides=None,
+                    chunksize=DEFAULT_CHUNKSIZE, use_cache=True, cache_dir=None):
+    """
+    Load an ADNI merge CSV with a typed schema, chunked parsing and a binary cache.
+
+    columns:          explicit list of columns to load (column pruning); defaults to all non-ID columns
+    keep_columns:     ID/date columns to keep in addition (e.g. ['RID', 'EXAMDATE'])
+    schema_overrides: {column: dtype} to override the declared/inferred schema
+    """
+    usecols = select_columns(path, columns, keep_columns)
+    schema = infer_schema(path, columns=usecols, overrides=schema_overrides)
+
+    cache_file = _cache_path(path, usecols, schema, cache_dir) if use_cache else None
+    if cache_file and os.path.exists(cache_file):
+        return pd.read_pickle(cache_file)
+
+    declared = set(ADNI_SCHEMA) | set(DATE_COLUMNS) | set(schema_overrides or {})
+    while True:
+        try:
+            df = _read_typed(path, usecols, schema, chunksize, declared)
+            break
+        except _WidenColumn as e:
+            # The sample said numeric, a later chunk disagrees: re-read the column as categorical
+            warnings.warn(f"{e.column}: {e.lost} non-numeric value(s) beyond the inferred sample "
+                          f"(e.g. {e.examples}); loading it as a categorical")
+            schema = dict(schema, **{e.column: 'category'})
+
+    if cache_file:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp = cache_file + '.tmp'
+        df.to_pickle(tmp)
+        os.replace(tmp, cache_file)
+    return df
+
+
+def _read_typed(path, usecols, schema, chunksize, declared):
+    """Chunked parse of the CSV into the schema's dtypes"""
+    # Categoricals are built by the parser itself, dates are read as strings and
+    # numeric columns are parsed by pandas and then downcast per chunk.
+    read_dtypes = {c: ('category' if d == 'category' else str)
+                   for c, d in schema.items() if d == 'category' or d.startswith('datetime')}
+    chunks = []
+    with pd.read_csv(path, usecols=usecols, dtype=read_dtypes, chunksize=chunksize, low_memory=False) as reader:
+        for chunk in reader:
+            chunks.append(apply_schema(chunk, schema, declared))
+    return concat_chunks(chunks, schema)[usecols]
+
+
+def _measure(fn):
+    """Run fn, returning its result, wall time and traced peak memory in MB"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / (1024 * 1024)
+
+
+def compare_with_read_csv(path, **kwargs):
+    """Load time, peak memory and resulting frame size: plain read_csv vs load_adni_table"""
+    report = {}
+    plain, seconds, peak = _measure(lambda: pd.read_csv(path, low_memory=False))
+    report["read_csv"] = {
+        "seconds": seconds,
+        "peak_mb": peak,
+        "frame_mb": plain.memory_usage(deep=True).sum() / (1024 * 1024),
+        "shape": list(plain.shape),
+    }
+    del plain
+
+    kwargs.setdefault('use_cache', False)
+    typed, seconds, peak = _measure(lambda: load_adni_table(path, **kwargs))
+    report["load_adni_table"] = {
+        "seconds": seconds,
+        "peak_mb": peak,
+        "frame_mb": typed.memory_usage(deep=True).sum() / (1024 * 1024),
+        "shape": list(typed.shape),
+    }
+
+    if kwargs.get('use_cache'):
+        _, seconds, peak = _measure(lambda: load_adni_table(path, **kwargs))
+        report["load_adni_table_cached"] = {"seconds": seconds, "peak_mb": peak}
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load an ADNI merge table with a typed schema")
+    parser.add_argument("path", help="ADNI merge CSV")
+    parser.add_argument("--keep", nargs="*", default=[], help="ID/date columns to keep (e.g. RID EXAMDATE)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the binary cache")
+    parser.add_argument("--compare", action="store_true", help="Report time/memory against plain read_csv")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        report = compare_with_read_csv(args.path, keep_columns=args.keep, chunksize=args.chunksize,
+                                       use_cache=not args.no_cache)
+        print(json.dumps(report, indent=2))
+        return
+
+    df = load_adni_table(args.path, keep_columns=args.keep, chunksize=args.chunksize,
+                         use_cache=not args.no_cache)
+    print(f"Loaded {df.shape[0]} rows, {df.shape[1]} columns "
+          f"({df.memory_usage(deep=True).sum() / (1024 * 1024):.1f} MB)")
+    print(df.dtypes.value_counts().to_string())
+
+
+if __name__ == '__main__':
+    main()
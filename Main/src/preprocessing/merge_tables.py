@@ -0,0 +1,293 @@
+"""
+As-of merge of the multimodal ADNI tables (demographics, cognitive scores, imaging
+summaries, biomarkers) into one visit-level table, replacing the hand-made
+ADNI_MERGE_FINAL_with_RAW_DX.csv.
+
+  - every modality is loaded in parallel with ``load_adni_table`` (typed, cached),
+  - each modality is joined onto the base table per subject (RID) with
+    ``pd.merge_asof``: the nearest EXAMDATE within a tolerance, on sorted keys,
+  - the result is written as partitioned columnar files (one per RID bucket,
+    Parquet when pyarrow/fastparquet is installed, pickle otherwise),
+  - a manifest keeps a content hash of every input's rows per partition, so a
+    rerun only rebuilds the partitions whose inputs changed.
+
+Config (JSON):
+  {
+    "base": "cognitive",
+    "tolerance_days": 180,
+    "modalities": [
+      {"name": "cognitive", "path": "ADNI_cognitive.csv"},
+      {"name": "demographics", "path": "PTDEMOG.csv", "date_column": null},
+      {"name": "imaging", "path": "UCSFFSX.csv", "columns": ["Hippocampus", "WholeBrain"]},
+      {"name": "biomarkers", "path": "UPENNBIOMK.csv", "tolerance_days": 365}
+    ]
+  }
+Relative paths are resolved against the config file. ``date_column: null`` joins a
+static table on RID only.
+
+Usage:
+  python -m src.preprocessing.merge_tables merge_config.json --output outputs/merged [--force]
+(run from the Main directory).
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from .load_data import load_adni_table
+
+SUBJECT_COLUMN = 'RID'
+DATE_COLUMN = 'EXAMDATE'
+DEFAULT_TOLERANCE_DAYS = 180
+DEFAULT_PARTITIONS = 16
+MANIFEST = 'manifest.json'
+
+
+def columnar_format():
+    """'parquet' when a Parquet engine is importable, otherwise 'pickle'"""
+    for engine in ('pyarrow', 'fastparquet'):
+        try:
+            __import__(engine)
+            return 'parquet'
+        except ImportError:
+            continue
+    return 'pickle'
+
+
+def load_config(path):
+    """Read a merge config and resolve modality paths relative to it"""
+    with open(path) as f:
+        config = json.load(f)
+    root = os.path.dirname(os.path.abspath(path))
+    for spec in config['modalities']:
+        if not os.path.isabs(spec['path']):
+            spec['path'] = os.path.join(root, spec['path'])
+    config.setdefault('base', config['modalities'][0]['name'])
+    return config
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def load_modality(spec):
+    """One modality table, keyed on RID (and its visit date), with rows lacking a RID dropped"""
+    date_column = spec.get('date_column', DATE_COLUMN)
+    keep = [SUBJECT_COLUMN] + ([date_column] if date_column else [])
+    columns = spec.get('columns')
+    if columns is not None:
+        columns = list(dict.fromkeys(keep + list(columns)))
+    df = load_adni_table(spec['path'], columns=columns, keep_columns=keep,
+                         schema_overrides={date_column: 'datetime64[ns]'} if date_column else None)
+    df = df[df[SUBJECT_COLUMN].notna()].copy()
+    df[SUBJECT_COLUMN] = df[SUBJECT_COLUMN].astype('int64')
+    return df
+
+
+def load_modalities(specs, workers=None):
+    """{name: frame} for every modality, loaded concurrently"""
+    workers = workers or min(len(specs), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frames = pool.map(load_modality, specs)
+        return {spec['name']: df for spec, df in zip(specs, frames)}
+
+
+def prefix_columns(df, name, taken, date_column):
+    """Rename a modality's columns that clash with columns already in the merged table"""
+    renames = {c: f"{c}_{name}" for c in df.columns
+               if c in taken and c not in (SUBJECT_COLUMN, date_column)}
+    return df.rename(columns=renames)
+
+
+def asof_join(left, right, name, date_column=DATE_COLUMN, right_date_column=DATE_COLUMN,
+              tolerance_days=DEFAULT_TOLERANCE_DAYS):
+    """
+    Attach to every left row the right row of the same RID whose date is nearest
+    (within tolerance_days). The matched date is kept as <date>_<name>.
+    Static right tables (right_date_column=None) are joined on RID alone.
+    """
+    right = prefix_columns(right, name, set(left.columns), right_date_column)
+    if right_date_column is None:
+        right = right.drop_duplicates(SUBJECT_COLUMN, keep='last')
+        return left.merge(right, on=SUBJECT_COLUMN, how='left')
+
+    matched_date = f"{right_date_column}_{name}"
+    right = right[right[right_date_column].notna()].rename(columns={right_date_column: '_asof_date'})
+    right[matched_date] = right['_asof_date']
+    right = right.sort_values('_asof_date', kind='stable')
+
+    # merge_asof needs non-null, globally sorted keys; undated left rows get no match
+    dated = left[date_column].notna()
+    ordered = left[dated].sort_values(date_column, kind='stable')
+    merged = pd.merge_asof(
+        ordered, right,
+        left_on=date_column, right_on='_asof_date',
+        by=SUBJECT_COLUMN,
+        direction='nearest',
+        tolerance=pd.Timedelta(days=tolerance_days),
+    ).drop(columns='_asof_date')
+    merged.index = ordered.index
+    if not dated.all():
+        merged = pd.concat([merged, left[~dated]])
+    return merged.sort_index()
+
+
+def merge_partition(frames, config):
+    """Base table of one partition with every other modality as-of joined onto it"""
+    specs = {spec['name']: spec for spec in config['modalities']}
+    base_name = config['base']
+    base_date = specs[base_name].get('date_column', DATE_COLUMN)
+    merged = frames[base_name].sort_values([SUBJECT_COLUMN, base_date], kind='stable').reset_index(drop=True)
+    for name, spec in specs.items():
+        if name == base_name:
+            continue
+        merged = asof_join(
+            merged, frames[name], name,
+            date_column=base_date,
+            right_date_column=spec.get('date_column', DATE_COLUMN),
+            tolerance_days=spec.get('tolerance_days', config.get('tolerance_days', DEFAULT_TOLERANCE_DAYS)),
+        )
+    return merged.reset_index(drop=True)
+
+
+def split_partitions(df, partitions):
+    """{bucket: rows} with subjects assigned to RID % partitions"""
+    buckets = df[SUBJECT_COLUMN] % partitions
+    return {int(b): part for b, part in df.groupby(buckets, sort=True)}
+
+
+def partition_hash(df):
+    """Content hash of a partition's rows (values and column layout)"""
+    digest = hashlib.sha1(','.join(f"{c}:{t}" for c, t in df.dtypes.astype(str).items()).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _partition_path(output_dir, bucket, fmt):
+    extension = 'parquet' if fmt == 'parquet' else 'pkl'
+    return os.path.join(output_dir, f"rid_bucket={bucket:03d}", f"part.{extension}")
+
+
+def _write(df, path, fmt):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    if fmt == 'parquet':
+        df.to_parquet(tmp, index=False)
+    else:
+        df.to_pickle(tmp)
+    os.replace(tmp, path)
+
+
+def _read_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_merged(config, output_dir, partitions=DEFAULT_PARTITIONS, workers=None, force=False):
+    """
+    Merge every modality into output_dir/rid_bucket=NNN/part.*, rebuilding only the
+    partitions whose input rows (or merge settings) changed since the last run.
+    Returns a summary of what was rebuilt.
+    """
+    start = time.perf_counter()
+    fmt = columnar_format()
+    manifest = {} if force else _read_manifest(output_dir)
+    settings = json.dumps({
+        "base": config['base'],
+        "tolerance_days": config.get('tolerance_days', DEFAULT_TOLERANCE_DAYS),
+        "modalities": [{k: v for k, v in spec.items() if k != 'path'} for spec in config['modalities']],
+        "partitions": partitions,
+        "format": fmt,
+    }, sort_keys=True)
+    signatures = {spec['name']: _file_signature(spec['path']) for spec in config['modalities']}
+
+    same_settings = manifest.get('settings') == settings
+    if same_settings and manifest.get('inputs') == signatures and all(
+            os.path.exists(os.path.join(output_dir, e['file'])) for e in manifest['partitions'].values()):
+        return {"output": output_dir, "format": fmt, "rebuilt": [], "unchanged": len(manifest['partitions']),
+                "removed": [], "rows": manifest.get('rows', 0), "seconds": time.perf_counter() - start}
+
+    frames = load_modalities(config['modalities'], workers)
+    split = {name: split_partitions(df, partitions) for name, df in frames.items()}
+    empty = {name: df.iloc[0:0] for name, df in frames.items()}
+    buckets = sorted(split[config['base']])
+
+    previous = manifest.get('partitions', {}) if same_settings else {}
+    entries, rebuilt, rows = {}, [], 0
+    for bucket in buckets:
+        parts = {name: split[name].get(bucket, empty[name]) for name in frames}
+        hashes = {name: partition_hash(part) for name, part in parts.items()}
+        path = _partition_path(output_dir, bucket, fmt)
+        old = previous.get(str(bucket))
+        if old and old['inputs'] == hashes and os.path.exists(path):
+            entries[str(bucket)] = old
+            rows += old['rows']
+            continue
+        merged = merge_partition(parts, config)
+        _write(merged, path, fmt)
+        entries[str(bucket)] = {"inputs": hashes, "rows": len(merged), "file": os.path.relpath(path, output_dir)}
+        rebuilt.append(bucket)
+        rows += len(merged)
+
+    # Buckets that no longer have base rows
+    removed = []
+    for bucket, entry in manifest.get('partitions', {}).items():
+        if bucket not in entries:
+            stale = os.path.join(output_dir, entry['file'])
+            if os.path.exists(stale):
+                os.remove(stale)
+                if not os.listdir(os.path.dirname(stale)):
+                    os.rmdir(os.path.dirname(stale))
+            removed.append(int(bucket))
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, MANIFEST), 'w') as f:
+        json.dump({"settings": settings, "inputs": signatures, "partitions": entries, "rows": rows}, f, indent=2)
+    return {"output": output_dir, "format": fmt, "rebuilt": rebuilt, "unchanged": len(entries) - len(rebuilt),
+            "removed": removed, "rows": rows, "seconds": time.perf_counter() - start}
+
+
+def read_merged(output_dir, columns=None, buckets=None):
+    """Load the merged table (optionally only some columns / RID buckets) back into one frame"""
+    manifest = _read_manifest(output_dir)
+    parts = []
+    for bucket, entry in sorted(manifest.get('partitions', {}).items(), key=lambda kv: int(kv[0])):
+        if buckets is not None and int(bucket) not in buckets:
+            continue
+        path = os.path.join(output_dir, entry['file'])
+        if path.endswith('.parquet'):
+            parts.append(pd.read_parquet(path, columns=columns))
+        else:
+            df = pd.read_pickle(path)
+            parts.append(df[columns] if columns is not None else df)
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(parts, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="As-of merge the multimodal ADNI tables per subject")
+    parser.add_argument("config", help="Merge config JSON (see module docstring)")
+    parser.add_argument("--output", required=True, help="Directory for the partitioned output")
+    parser.add_argument("--partitions", type=int, default=DEFAULT_PARTITIONS, help="Number of RID buckets")
+    parser.add_argument("--workers", type=int, default=None, help="Threads used to load the modalities")
+    parser.add_argument("--force", action="store_true", help="Rebuild every partition")
+    args = parser.parse_args(argv)
+
+    summary = build_merged(load_config(args.config), args.output, partitions=args.partitions,
+                           workers=args.workers, force=args.force)
+    print(f"Merged {summary['rows']} rows into {args.output} ({summary['format']}): "
+          f"{len(summary['rebuilt'])} partition(s) rebuilt, {summary['unchanged']} unchanged, "
+          f"{len(summary['removed'])} removed in {summary['seconds']:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Tests for merge_tables: the as-of join against a brute-force nearest-date match, and
+incremental rebuilds that only touch the RID bucket whose input changed.
+Run from Main/ with pytest or directly: python -m src.preprocessing.test_merge_tables
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .merge_tables import asof_join, build_merged, read_merged
+
+TOLERANCE_DAYS = 90
+
+
+def random_visits(rng, subjects, visits, with_missing_dates=False):
+    """Visit rows with random second-resolution dates, so no two candidates tie on distance"""
+    rid = rng.integers(0, subjects, size=visits)
+    seconds = rng.integers(0, 3 * 365 * 86400, size=visits)
+    dates = pd.Series(pd.Timestamp('2010-01-01') + pd.to_timedelta(seconds, unit='s'))
+    if with_missing_dates:
+        dates[rng.random(visits) < 0.1] = pd.NaT
+    return pd.DataFrame({'RID': rid.astype('int64'), 'EXAMDATE': dates})
+
+
+def brute_force_match(left, right, tolerance):
+    """For each left row, the right row of the same RID with the nearest date within tolerance"""
+    matches = []
+    for _, row in left.iterrows():
+        candidates = right[(right['RID'] == row['RID']) & right['EXAMDATE'].notna()]
+        if pd.isna(row['EXAMDATE']) or candidates.empty:
+            matches.append(None)
+            continue
+        distance = (candidates['EXAMDATE'] - row['EXAMDATE']).abs()
+        best = distance.idxmin()
+        matches.append(best if distance[best] <= tolerance else None)
+    return matches
+
+
+def test_asof_join_matches_brute_force():
+    rng = np.random.default_rng(0)
+    left = random_visits(rng, subjects=20, visits=300, with_missing_dates=True)
+    left['MMSE'] = rng.integers(10, 30, size=len(left))
+    right = random_visits(rng, subjects=25, visits=200)
+    right['Hippocampus'] = rng.normal(7000, 800, size=len(right))
+    right.loc[rng.random(len(right)) < 0.05, 'EXAMDATE'] = pd.NaT
+
+    merged = asof_join(left, right, 'imaging', tolerance_days=TOLERANCE_DAYS)
+    expected = brute_force_match(left, right, pd.Timedelta(days=TOLERANCE_DAYS))
+
+    # Left rows keep their order and values
+    assert list(merged.index) == list(left.index)
+    pd.testing.assert_frame_equal(merged[left.columns], left)
+    for i, match in zip(merged.index, expected):
+        if match is None:
+            assert pd.isna(merged.at[i, 'Hippocampus']) and pd.isna(merged.at[i, 'EXAMDATE_imaging']), i
+        else:
+            assert merged.at[i, 'Hippocampus'] == right.at[match, 'Hippocampus'], i
+            assert merged.at[i, 'EXAMDATE_imaging'] == right.at[match, 'EXAMDATE'], i
+
+
+def write_tables(root, cognitive, imaging):
+    cognitive.to_csv(os.path.join(root, 'cognitive.csv'), index=False)
+    imaging.to_csv(os.path.join(root, 'imaging.csv'), index=False)
+
+
+def test_changed_input_rebuilds_only_its_bucket():
+    rng = np.random.default_rng(1)
+    cognitive = random_visits(rng, subjects=40, visits=400)
+    cognitive['MMSE'] = rng.integers(10, 30, size=len(cognitive))
+    imaging = random_visits(rng, subjects=40, visits=300)
+    imaging['Hippocampus'] = rng.normal(7000, 800, size=len(imaging)).round(1)
+
+    with tempfile.TemporaryDirectory() as root:
+        config = {
+            'base': 'cognitive',
+            'tolerance_days': TOLERANCE_DAYS,
+            'modalities': [
+                {'name': 'cognitive', 'path': os.path.join(root, 'cognitive.csv')},
+                {'name': 'imaging', 'path': os.path.join(root, 'imaging.csv')},
+            ],
+        }
+        output = os.path.join(root, 'merged')
+        write_tables(root, cognitive, imaging)
+        first = build_merged(config, output, partitions=4)
+        assert sorted(first['rebuilt']) == [0, 1, 2, 3]
+
+        # Unchanged inputs: nothing is rebuilt
+        assert build_merged(config, output, partitions=4)['rebuilt'] == []
+
+        # Change one imaging value of a subject in bucket 1 (RID % 4 == 1)
+        row = imaging.index[imaging['RID'] % 4 == 1][0]
+        imaging.loc[row, 'Hippocampus'] += 100
+        write_tables(root, cognitive, imaging)
+        second = build_merged(config, output, partitions=4)
+        assert second['rebuilt'] == [1]
+        assert second['unchanged'] == 3
+
+        # The incremental output equals a full rebuild
+        incremental = read_merged(output)
+        full = os.path.join(root, 'full')
+        build_merged(config, full, partitions=4, force=True)
+        pd.testing.assert_frame_equal(incremental, read_merged(full))
+
+
+if __name__ == "__main__":
+    tests = [
+        test_asof_join_matches_brute_force,
+        test_changed_input_rebuilds_only_its_bucket,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
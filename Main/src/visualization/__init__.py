@@ -0,0 +1 @@
+"""Evaluation figures and reports for trained models."""
@@ -0,0 +1,448 @@
+"""
+Evaluation report for a trained model artifact: ROC and precision-recall curves,
+confusion matrix, feature importances and a metrics table, generated in one command
+instead of notebook cells.
+
+  - the model and the test set are hashed; outputs live under
+    <output>/<model name>/<model hash>-<test hash>/ and a figure or table that already
+    exists there is never recomputed,
+  - test-set scores are computed once and cached (scores.npz) next to the outputs,
+  - the figures and tables are produced on a process pool,
+  - curve thresholds come from one sort of the scores and cumulative sums
+    (no refitting or re-thresholding per point).
+
+Figures need matplotlib; without it only the tables (.csv / .json) are written.
+Multi-class targets (e.g. DX = CN / MCI / Dementia) get one-vs-rest curves per class.
+String labels are mapped onto integer model classes in sorted order, as LabelEncoder does.
+
+Usage:
+  python -m src.visualization.evaluation_report ../outputs/models/xgb.joblib test.csv \
+      [--target DX] [--output outputs/figures] [--workers 4] [--force]
+(run from the Main directory).
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from ..preprocessing.load_data import ID_COLUMNS
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), '..', '..', 'outputs', 'figures')
+DEFAULT_TARGET = 'DX'
+
+# Bump a task's version when its output changes, so cached files are regenerated
+TASKS = {
+    'metrics': 1,
+    'roc': 1,
+    'precision_recall': 1,
+    'confusion_matrix': 1,
+    'feature_importance': 1,
+}
+
+
+def file_hash(path, block_size=1 << 20):
+    """SHA-1 of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def binary_curve(y_true, scores):
+    """
+    False and true positive counts at every distinct score threshold, highest first.
+    One stable sort plus cumulative sums; ties share a single threshold.
+    """
+    order = np.argsort(scores, kind='mergesort')[::-1]
+    scores = scores[order]
+    y_true = y_true[order]
+    last_of_tie = np.r_[np.flatnonzero(np.diff(scores)), len(scores) - 1]
+    tps = np.cumsum(y_true)[last_of_tie]
+    fps = last_of_tie + 1 - tps
+    return fps, tps, scores[last_of_tie]
+
+
+def roc_curve(y_true, scores):
+    """(fpr, tpr, thresholds) starting at (0, 0), as sklearn.metrics.roc_curve"""
+    fps, tps, thresholds = binary_curve(y_true, scores)
+    fpr = np.r_[0.0, fps / fps[-1]] if fps[-1] else np.full(len(fps) + 1, np.nan)
+    tpr = np.r_[0.0, tps / tps[-1]] if tps[-1] else np.full(len(tps) + 1, np.nan)
+    return fpr, tpr, np.r_[np.inf, thresholds]
+
+
+def precision_recall_curve(y_true, scores):
+    """(precision, recall, thresholds) by decreasing threshold, ending at recall 0"""
+    fps, tps, thresholds = binary_curve(y_true, scores)
+    precision = tps / (tps + fps)
+    recall = tps / tps[-1] if tps[-1] else np.zeros(len(tps))
+    return np.r_[1.0, precision], np.r_[0.0, recall], thresholds
+
+
+def auc(x, y):
+    """Trapezoidal area under a curve given in order"""
+    return float(abs(np.sum(np.diff(x) * (y[1:] + y[:-1]) / 2)))
+
+
+def average_precision(precision, recall):
+    return float(np.sum(np.diff(recall) * precision[1:]))
+
+
+def confusion_matrix(y_true, y_pred, n_classes):
+    """n_classes x n_classes counts (rows: true, columns: predicted) with one bincount"""
+    return np.bincount(y_true * n_classes + y_pred, minlength=n_classes * n_classes).reshape(n_classes, n_classes)
+
+
+def classification_metrics(y_true, y_pred, proba, class_names):
+    """Accuracy, per-class precision/recall/F1/ROC AUC and macro/weighted averages"""
+    n = len(class_names)
+    cm = confusion_matrix(y_true, y_pred, n)
+    tp = np.diag(cm).astype(np.float64)
+    support = cm.sum(axis=1)
+    predicted = cm.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(support > 0, tp / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+    per_class = {}
+    for i, name in enumerate(class_names):
+        positives = (y_true == i).astype(np.int64)
+        fpr, tpr, _ = roc_curve(positives, proba[:, i])
+        per_class[name] = {
+            "precision": float(precision[i]),
+            "recall": float(recall[i]),
+            "f1": float(f1[i]),
+            "roc_auc": auc(fpr, tpr) if 0 < positives.sum() < len(positives) else None,
+            "support": int(support[i]),
+        }
+    weights = support / support.sum()
+    aucs = [c["roc_auc"] for c in per_class.values() if c["roc_auc"] is not None]
+    return {
+        "accuracy": float(tp.sum() / cm.sum()),
+        "macro_f1": float(f1.mean()),
+        "weighted_f1": float((f1 * weights).sum()),
+        "macro_roc_auc": float(np.mean(aucs)) if aucs else None,
+        "n_samples": int(cm.sum()),
+        "classes": per_class,
+    }
+
+
+def _curve_targets(y_true, proba, class_names):
+    """(label, binary truth, scores): the positive class for binary targets, one-vs-rest otherwise"""
+    if len(class_names) == 2:
+        return [(class_names[1], (y_true == 1).astype(np.int64), proba[:, 1])]
+    return [(name, (y_true == i).astype(np.int64), proba[:, i]) for i, name in enumerate(class_names)]
+
+
+def _pyplot():
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        return plt
+    except ImportError:
+        return None
+
+
+def task_metrics(data, out_dir):
+    metrics = classification_metrics(data["y_true"], data["y_pred"], data["proba"], data["class_names"])
+    path = os.path.join(out_dir, 'metrics.json')
+    with open(path, 'w') as f:
+        json.dump(metrics, f, indent=2)
+    rows = pd.DataFrame(metrics["classes"]).T
+    rows.loc["macro avg"] = [None, None, metrics["macro_f1"], metrics["macro_roc_auc"], metrics["n_samples"]]
+    rows.to_csv(os.path.join(out_dir, 'metrics.csv'), index_label='class')
+    return ['metrics.json', 'metrics.csv']
+
+
+def task_roc(data, out_dir):
+    tables, plt = [], _pyplot()
+    if plt is not None:
+        fig, ax = plt.subplots(figsize=(6, 6))
+    for label, truth, scores in _curve_targets(data["y_true"], data["proba"], data["class_names"]):
+        fpr, tpr, thresholds = roc_curve(truth, scores)
+        tables.append(pd.DataFrame({"class": label, "threshold": thresholds, "fpr": fpr, "tpr": tpr}))
+        if plt is not None:
+            ax.plot(fpr, tpr, label=f"{label} (AUC = {auc(fpr, tpr):.3f})")
+    pd.concat(tables).to_csv(os.path.join(out_dir, 'roc.csv'), index=False)
+    if plt is None:
+        return ['roc.csv']
+    ax.plot([0, 1], [0, 1], linestyle='--', color='grey')
+    ax.set(xlabel='False positive rate', ylabel='True positive rate', title=f"ROC - {data['model_name']}")
+    ax.legend(loc='lower right')
+    fig.savefig(os.path.join(out_dir, 'roc.png'), dpi=150, bbox_inches='tight')
+    plt.close(fig)
+    return ['roc.csv', 'roc.png']
+
+
+def task_precision_recall(data, out_dir):
+    tables, plt = [], _pyplot()
+    if plt is not None:
+        fig, ax = plt.subplots(figsize=(6, 6))
+    for label, truth, scores in _curve_targets(data["y_true"], data["proba"], data["class_names"]):
+        precision, recall, thresholds = precision_recall_curve(truth, scores)
+        tables.append(pd.DataFrame({"class": label, "threshold": np.r_[np.inf, thresholds],
+                                    "precision": precision, "recall": recall}))
+        if plt is not None:
+            ax.step(recall, precision, where='post',
+                    label=f"{label} (AP = {average_precision(precision, recall):.3f})")
+    pd.concat(tables).to_csv(os.path.join(out_dir, 'precision_recall.csv'), index=False)
+    if plt is None:
+        return ['precision_recall.csv']
+    ax.set(xlabel='Recall', ylabel='Precision', title=f"Precision-recall - {data['model_name']}",
+           xlim=(0, 1), ylim=(0, 1.05))
+    ax.legend(loc='lower left')
+    fig.savefig(os.path.join(out_dir, 'precision_recall.png'), dpi=150, bbox_inches='tight')
+    plt.close(fig)
+    return ['precision_recall.csv', 'precision_recall.png']
+
+
+def task_confusion_matrix(data, out_dir):
+    names = data["class_names"]
+    cm = confusion_matrix(data["y_true"], data["y_pred"], len(names))
+    pd.DataFrame(cm, index=names, columns=names).to_csv(os.path.join(out_dir, 'confusion_matrix.csv'),
+                                                        index_label='true \\ predicted')
+    plt = _pyplot()
+    if plt is None:
+        return ['confusion_matrix.csv']
+    fig, ax = plt.subplots(figsize=(1.5 * len(names) + 2, 1.5 * len(names) + 1.5))
+    image = ax.imshow(cm, cmap='Blues')
+    for i in range(len(names)):
+        for j in range(len(names)):
+            ax.text(j, i, str(cm[i, j]), ha='center', va='center',
+                    color='white' if cm[i, j] > cm.max() / 2 else 'black')
+    ax.set(xticks=range(len(names)), yticks=range(len(names)), xticklabels=names, yticklabels=names,
+           xlabel='Predicted', ylabel='True', title=f"Confusion matrix - {data['model_name']}")
+    fig.colorbar(image, ax=ax)
+    fig.savefig(os.path.join(out_dir, 'confusion_matrix.png'), dpi=150, bbox_inches='tight')
+    plt.close(fig)
+    return ['confusion_matrix.csv', 'confusion_matrix.png']
+
+
+def task_feature_importance(data, out_dir, top_n=30):
+    importances = data.get("importances")
+    if importances is None:
+        return []
+    table = pd.DataFrame({"feature": data["feature_names"], "importance": importances})
+    table = table.sort_values('importance', ascending=False)
+    table.to_csv(os.path.join(out_dir, 'feature_importance.csv'), index=False)
+    plt = _pyplot()
+    if plt is None:
+        return ['feature_importance.csv']
+    top = table.head(top_n)[::-1]
+    fig, ax = plt.subplots(figsize=(7, 0.3 * len(top) + 1.5))
+    ax.barh(top["feature"], top["importance"])
+    ax.set(xlabel='Importance', title=f"Top {len(top)} features - {data['model_name']}")
+    fig.savefig(os.path.join(out_dir, 'feature_importance.png'), dpi=150, bbox_inches='tight')
+    plt.close(fig)
+    return ['feature_importance.csv', 'feature_importance.png']
+
+
+TASK_FUNCTIONS = {
+    'metrics': task_metrics,
+    'roc': task_roc,
+    'precision_recall': task_precision_recall,
+    'confusion_matrix': task_confusion_matrix,
+    'feature_importance': task_feature_importance,
+}
+
+
+def _final_estimator(model):
+    return model.steps[-1][1] if hasattr(model, 'steps') else model
+
+
+def feature_importances(model, columns):
+    """(names, importances) from feature_importances_ or |coef_|, or (None, None)"""
+    estimator = _final_estimator(model)
+    if hasattr(estimator, 'feature_importances_'):
+        values = np.asarray(estimator.feature_importances_, dtype=np.float64)
+    elif hasattr(estimator, 'coef_'):
+        values = np.abs(np.atleast_2d(estimator.coef_)).mean(axis=0)
+    else:
+        return None, None
+    names = None
+    if hasattr(model, 'steps') and len(model.steps) > 1:
+        try:
+            names = list(model[:-1].get_feature_names_out())
+        except Exception:
+            names = None
+    if names is None:
+        names = model_feature_names(estimator) or columns
+    if len(names) != len(values):
+        names = [f"f{i}" for i in range(len(values))]
+    return [str(n) for n in names], values
+
+
+def model_feature_names(model):
+    """Feature names the model was trained on (feature_names_, then feature_names_in_), or None"""
+    for attr in ('feature_names_', 'feature_names_in_'):
+        names = getattr(model, attr, None)
+        if names is not None:
+            return [str(n) for n in names]
+    return None
+
+
+def load_test_set(path, target, feature_names=None, n_features=None):
+    """
+    Features and target of a test CSV: the model's input columns, or everything but the
+    target and ID/date columns when the model does not name them. In that case the column
+    count must match n_features (when the model declares it).
+    """
+    df = pd.read_csv(path, low_memory=False)
+    df = df[df[target].notna()]
+    if feature_names is not None:
+        missing = [c for c in feature_names if c not in df.columns]
+        if missing:
+            raise ValueError(f"Test set {path} lacks model features: {missing}")
+        X = df[list(feature_names)]
+    else:
+        X = df.drop(columns=[target] + [c for c in ID_COLUMNS if c in df.columns])
+        if n_features is not None and X.shape[1] != n_features:
+            raise ValueError(
+                f"Model has no feature names and expects {n_features} features, but {path} has "
+                f"{X.shape[1]} columns besides '{target}' and ID/date columns: {list(X.columns)}. "
+                f"Drop the extra columns from the test set or save the model with feature names"
+            )
+    return X, df[target].to_numpy()
+
+
+def encode_target(y, classes):
+    """Indices into the model's classes_; string labels map onto integer classes in sorted order"""
+    classes = np.asarray(classes)
+    if np.isin(y, classes).all():
+        lookup = {c: i for i, c in enumerate(classes.tolist())}
+        return np.array([lookup[v] for v in y.tolist()]), [str(c) for c in classes]
+    labels = np.unique(y.astype(str))
+    if len(labels) != len(classes):
+        raise ValueError(f"Test labels {labels.tolist()} do not match model classes {classes.tolist()}")
+    return np.searchsorted(labels, y.astype(str)), labels.tolist()
+
+
+def compute_scores(model_path, test_path, target):
+    """Predicted probabilities and encoded labels for the test set, plus importances"""
+    model = joblib.load(model_path)
+    n_features = getattr(model, 'n_features_in_', getattr(model, 'n_features_', None))
+    X, y = load_test_set(test_path, target, model_feature_names(model), n_features)
+    proba = np.asarray(model.predict_proba(X), dtype=np.float64)
+    y_true, class_names = encode_target(y, getattr(model, 'classes_', np.arange(proba.shape[1])))
+    names, importances = feature_importances(model, list(X.columns))
+    return {
+        "y_true": y_true.astype(np.int64),
+        "proba": proba,
+        "class_names": class_names,
+        "feature_names": names,
+        "importances": importances,
+    }
+
+
+def _load_scores(path):
+    with np.load(path, allow_pickle=False) as npz:
+        data = {k: npz[k] for k in npz.files}
+    data["class_names"] = data["class_names"].tolist()
+    data["feature_names"] = data["feature_names"].tolist() if "feature_names" in data else None
+    return data
+
+
+def _save_scores(path, data):
+    arrays = {k: v for k, v in data.items() if v is not None}
+    arrays["class_names"] = np.asarray(arrays["class_names"])
+    if "feature_names" in arrays:
+        arrays["feature_names"] = np.asarray(arrays["feature_names"])
+    tmp = path + '.tmp.npz'
+    np.savez(tmp, **arrays)
+    os.replace(tmp, path)
+
+
+def _run_task(name, data, out_dir):
+    start = time.perf_counter()
+    files = TASK_FUNCTIONS[name](data, out_dir)
+    return name, files, time.perf_counter() - start
+
+
+def generate_report(model_path, test_path, target=DEFAULT_TARGET, output_dir=DEFAULT_OUTPUT,
+                    workers=None, force=False):
+    """
+    Write every figure and table for (model, test set) that is not already cached.
+    Returns {"directory", "generated", "cached", "seconds"}.
+    """
+    start = time.perf_counter()
+    model_name = os.path.splitext(os.path.basename(model_path))[0]
+    key = f"{file_hash(model_path)[:12]}-{file_hash(test_path)[:12]}"
+    out_dir = os.path.join(output_dir, model_name, key)
+    os.makedirs(out_dir, exist_ok=True)
+
+    manifest_path = os.path.join(out_dir, 'manifest.json')
+    manifest = {}
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    done = manifest.get("tasks", {})
+    pending = [name for name, version in TASKS.items()
+               if force or done.get(name, {}).get("version") != version
+               or not all(os.path.exists(os.path.join(out_dir, f)) for f in done[name]["files"])
+               # figures skipped earlier (no matplotlib) are produced once it is available
+               or (done[name].get("figures_missing") and _pyplot() is not None)]
+    if not pending:
+        return {"directory": out_dir, "generated": [], "cached": list(TASKS), "seconds": time.perf_counter() - start}
+
+    scores_path = os.path.join(out_dir, 'scores.npz')
+    if os.path.exists(scores_path) and not force:
+        data = _load_scores(scores_path)
+    else:
+        data = compute_scores(model_path, test_path, target)
+        _save_scores(scores_path, data)
+    data["y_pred"] = data["proba"].argmax(axis=1)
+    data["model_name"] = model_name
+
+    workers = workers or min(len(pending), os.cpu_count() or 1)
+    if workers <= 1:
+        results = [_run_task(name, data, out_dir) for name in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_task, pending, [data] * len(pending), [out_dir] * len(pending)))
+
+    figures_missing = _pyplot() is None
+    for name, files, seconds in results:
+        done[name] = {"version": TASKS[name], "files": files, "seconds": seconds,
+                      "figures_missing": figures_missing and name != 'metrics'}
+    with open(manifest_path, 'w') as f:
+        json.dump({
+            "model": os.path.abspath(model_path),
+            "test_set": os.path.abspath(test_path),
+            "target": target,
+            "tasks": done,
+        }, f, indent=2)
+    return {"directory": out_dir, "generated": pending, "cached": [t for t in TASKS if t not in pending],
+            "seconds": time.perf_counter() - start}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate evaluation figures and metric tables for a model")
+    parser.add_argument("model", help="Trained model artifact (.pkl / .joblib with predict_proba)")
+    parser.add_argument("test_set", help="Test set CSV including the target column")
+    parser.add_argument("--target", default=DEFAULT_TARGET)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Root directory for the report")
+    parser.add_argument("--workers", type=int, default=None, help="Processes used to draw figures")
+    parser.add_argument("--force", action="store_true", help="Regenerate everything")
+    args = parser.parse_args(argv)
+
+    try:
+        summary = generate_report(args.model, args.test_set, target=args.target, output_dir=args.output,
+                                  workers=args.workers, force=args.force)
+    except ValueError as e:
+        raise SystemExit(f"Cannot evaluate {args.model}: {e}")
+    print(f"Report in {os.path.normpath(summary['directory'])}: generated {summary['generated'] or 'nothing'}, "
+          f"cached {summary['cached'] or 'nothing'} ({summary['seconds']:.2f}s)")
+    if _pyplot() is None:
+        print("matplotlib is not installed: only tables were written")
+
+
+if __name__ == '__main__':
+    main()
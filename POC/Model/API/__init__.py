@@ -0,0 +1,5 @@
+"""
+Only here to keep pytest collection working: Model/ and Model/API/ both contain a
+test_model_api.py, and without this file pytest would import both as the same top-level
+module and stop with an import-file-mismatch error. Nothing imports this package.
+"""
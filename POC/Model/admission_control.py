@@ -0,0 +1,179 @@
+"""
+Admission control and backpressure for the prediction API.
+Each endpoint class has its own concurrency limit and a bounded wait queue, all under a
+shared cap on concurrently running requests. When a class is saturated, requests are
+rejected straight away (429 when its queue is full, 503 when the queue wait expires),
+with a Retry-After hint, instead of piling up unbounded work.
+Lower priority numbers are admitted first, so cheap /predict calls are not stuck behind
+heavy /predict-enhanced or /dataset-info work.
+"""
+import math
+import threading
+import time
+
+from flask import jsonify
+
+
+class EndpointClass:
+    """Limits for one class of endpoints"""
+
+    def __init__(self, name, priority, max_concurrent, max_queue, queue_timeout_ms):
+        self.name = name
+        self.priority = priority
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout_ms = queue_timeout_ms
+
+
+# light: /predict, heavy: /predict-enhanced and /dataset-info, batch: multi-row endpoints
+DEFAULT_CLASSES = [
+    EndpointClass('light', priority=0, max_concurrent=8, max_queue=32, queue_timeout_ms=1000),
+    EndpointClass('heavy', priority=1, max_concurrent=4, max_queue=8, queue_timeout_ms=2000),
+    EndpointClass('batch', priority=2, max_concurrent=2, max_queue=4, queue_timeout_ms=2000),
+]
+
+
+def configured_classes(config):
+    """DEFAULT_CLASSES with ADMISSION_<CLASS>_MAX_CONCURRENT / _MAX_QUEUE overrides from the app config"""
+    classes = []
+    for default in DEFAULT_CLASSES:
+        prefix = f'ADMISSION_{default.name.upper()}_'
+        max_concurrent = config.get(prefix + 'MAX_CONCURRENT')
+        max_queue = config.get(prefix + 'MAX_QUEUE')
+        classes.append(EndpointClass(
+            default.name, default.priority,
+            max_concurrent=default.max_concurrent if max_concurrent in (None, '') else int(max_concurrent),
+            max_queue=default.max_queue if max_queue in (None, '') else int(max_queue),
+            queue_timeout_ms=default.queue_timeout_ms,
+        ))
+    return classes
+
+
+class AdmissionRejected(Exception):
+    """Raised by AdmissionController.run when a request is not admitted"""
+
+    def __init__(self, name, status, retry_after):
+        super().__init__(f"{name} class at capacity ({status})")
+        self.name = name
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Counts running and queued requests per endpoint class and decides who may run"""
+
+    def __init__(self, classes=None, max_total=8):
+        self.classes = {c.name: c for c in (classes or DEFAULT_CLASSES)}
+        self.max_total = max_total
+        self.cond = threading.Condition()
+        self.active = {name: 0 for name in self.classes}
+        self.waiting = {name: 0 for name in self.classes}
+        self.admitted = {name: 0 for name in self.classes}
+        self.rejected = {name: 0 for name in self.classes}
+        self.timed_out = {name: 0 for name in self.classes}
+        # Exponentially weighted service time, used for Retry-After estimates
+        self.service_ms = {name: None for name in self.classes}
+
+    def _can_admit(self, cls):
+        if self.active[cls.name] >= cls.max_concurrent:
+            return False
+        if sum(self.active.values()) >= self.max_total:
+            return False
+        # Higher-priority requests already waiting go first, unless their own class is full
+        # (they could not take the slot anyway)
+        return not any(
+            self.waiting[other.name] and self.active[other.name] < other.max_concurrent
+            for other in self.classes.values()
+            if other.priority < cls.priority
+        )
+
+    def acquire(self, name):
+        """Returns None when admitted, otherwise the HTTP status to reject with (429 or 503)"""
+        cls = self.classes[name]
+        with self.cond:
+            if self._can_admit(cls):
+                self.active[name] += 1
+                self.admitted[name] += 1
+                return None
+            if self.waiting[name] >= cls.max_queue:
+                self.rejected[name] += 1
+                return 429
+            self.waiting[name] += 1
+            try:
+                ok = self.cond.wait_for(lambda: self._can_admit(cls), timeout=cls.queue_timeout_ms / 1000)
+            finally:
+                self.waiting[name] -= 1
+            if not ok:
+                self.timed_out[name] += 1
+                # Lower-priority waiters may now be admissible
+                self.cond.notify_all()
+                return 503
+            self.active[name] += 1
+            self.admitted[name] += 1
+            return None
+
+    def release(self, name, elapsed_ms):
+        with self.cond:
+            self.active[name] -= 1
+            previous = self.service_ms[name]
+            self.service_ms[name] = elapsed_ms if previous is None else 0.8 * previous + 0.2 * elapsed_ms
+            self.cond.notify_all()
+
+    def retry_after(self, name):
+        """Seconds a rejected client should wait: time to drain the class's running and queued work"""
+        cls = self.classes[name]
+        with self.cond:
+            service_ms = self.service_ms[name] or 1000
+            backlog = self.active[name] + self.waiting[name]
+        return max(1, math.ceil(backlog * service_ms / 1000 / max(cls.max_concurrent, 1)))
+
+    def run(self, name, fn):
+        """Run fn admitted under the given endpoint class; raises AdmissionRejected when it is not admitted"""
+        status = self.acquire(name)
+        if status is not None:
+            raise AdmissionRejected(name, status, self.retry_after(name))
+        start = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            self.release(name, (time.perf_counter() - start) * 1000)
+
+    def call(self, name, fn):
+        """Run fn admitted under the given endpoint class, or return the 429/503 rejection response"""
+        try:
+            return self.run(name, fn)
+        except AdmissionRejected as e:
+            return rejection_response(e)
+
+    def metrics(self):
+        with self.cond:
+            return {
+                "max_concurrent_total": self.max_total,
+                "classes": {
+                    name: {
+                        "priority": cls.priority,
+                        "max_concurrent": cls.max_concurrent,
+                        "max_queue": cls.max_queue,
+                        "active": self.active[name],
+                        "queue_depth": self.waiting[name],
+                        "admitted": self.admitted[name],
+                        "rejected_queue_full": self.rejected[name],
+                        "rejected_queue_timeout": self.timed_out[name],
+                        "avg_service_ms": self.service_ms[name],
+                    }
+                    for name, cls in self.classes.items()
+                },
+            }
+
+
+def rejection_response(rejected):
+    """429 (queue full) or 503 (queue wait expired) response with a Retry-After hint"""
+    response = jsonify({
+        "success": False,
+        "error": "Server is at capacity",
+        "message": "Too many requests queued, please retry later"
+                   if rejected.status == 429 else "Timed out waiting for capacity, please retry later"
+    })
+    response.status_code = rejected.status
+    response.headers['Retry-After'] = str(rejected.retry_after)
+    return response
@@ -0,0 +1,159 @@
+"""
+Single Flask app hosting every prediction API variant in one process.
+
+The model (or ensemble) and fused scalers are loaded once by model_resources and shared by
+the selected route sets (the reference cohort only when the enhanced routes are served):
+    enhanced - enhanced_model_api.py (/predict, /predict-enhanced, /predict-batch, /what-if, ...)
+    legacy   - legacy_api.py, the original /health, /predict and /model-info
+
+Configuration precedence (later wins):
+    DEFAULT_CONFIG < JSON file (API_CONFIG env var or config_path) < environment < keyword overrides
+
+Usage:
+    python app_factory.py                                  # enhanced routes on port 5001
+    python app_factory.py --blueprints enhanced,legacy     # legacy routes under /legacy
+    API_BLUEPRINTS=legacy python app_factory.py --port 5000
+
+In-process (tests, benchmarks); each call returns an independent app:
+    app = create_app(API_BLUEPRINTS='enhanced,legacy', HISTORY_DB_PATH='')
+    client = app.test_client()
+"""
+import argparse
+import json
+import os
+
+from flask import Flask
+from flask_cors import CORS
+
+from model_resources import MODEL_DIR, get_resources
+
+DEFAULT_CONFIG = {
+    # Comma-separated route sets to mount: enhanced, legacy
+    'API_BLUEPRINTS': 'enhanced',
+    # Where the legacy routes are mounted when served next to the enhanced ones
+    'LEGACY_URL_PREFIX': '/legacy',
+    # Model file (default: discovered under test_models/) or an ensemble config
+    'MODEL_PATH': None,
+    'ENSEMBLE_CONFIG': None,
+    # Comma-separated fitted scaler .pkl files applied before the model
+    'SCALER_PATHS': '',
+    'DATASET_PATH': 'alzheimers_disease_data.csv',
+    'STATS_WORKERS': 1,
+    # An empty path disables the prediction history store. The default lives in the source tree
+    # (git-ignored) for local runs; deployments should point it at a data directory
+    'HISTORY_DB_PATH': os.path.join(MODEL_DIR, 'prediction_history.db'),
+    'ADMISSION_MAX_CONCURRENT': 8,
+    # Per-class limits; None keeps admission_control.DEFAULT_CLASSES (light 8/32, heavy 4/8, batch 2/4)
+    'ADMISSION_LIGHT_MAX_CONCURRENT': None,
+    'ADMISSION_LIGHT_MAX_QUEUE': None,
+    'ADMISSION_HEAVY_MAX_CONCURRENT': None,
+    'ADMISSION_HEAVY_MAX_QUEUE': None,
+    'ADMISSION_BATCH_MAX_CONCURRENT': None,
+    'ADMISSION_BATCH_MAX_QUEUE': None,
+    'DRIFT_WINDOW_SIZE': 5000,
+    'DRIFT_INTERVAL_SECONDS': 60,
+    'MAX_BATCH_ROWS': 100000,
+    'WHAT_IF_MAX_POINTS': 10000,
+    'WHAT_IF_CACHE_SIZE': 1024,
+}
+
+
+def _blueprint_modules():
+    # Imported lazily so each route module is only loaded when it is served
+    import enhanced_model_api
+    import legacy_api
+    return {'enhanced': enhanced_model_api, 'legacy': legacy_api}
+
+
+def load_config(path=None, **overrides):
+    """Merge defaults, the JSON config file, the environment and explicit overrides"""
+    config = dict(DEFAULT_CONFIG)
+    path = path or os.environ.get('API_CONFIG')
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            file_config = json.load(f)
+        unknown = sorted(set(file_config) - set(DEFAULT_CONFIG))
+        if unknown:
+            raise ValueError(f"Unknown config keys in {path}: {unknown}")
+        config.update(file_config)
+    for key in DEFAULT_CONFIG:
+        if key in os.environ:
+            config[key] = os.environ[key]
+    config.update(overrides)
+    return config
+
+
+def selected_blueprints(config):
+    """Route set names from API_BLUEPRINTS, validated"""
+    value = config['API_BLUEPRINTS']
+    names = [n.strip().lower() for n in (value.split(',') if isinstance(value, str) else value) if n.strip()]
+    unknown = [n for n in names if n not in ('enhanced', 'legacy')]
+    if unknown or not names:
+        raise ValueError(f"Unknown API_BLUEPRINTS {unknown or value!r}; choose from: enhanced, legacy")
+    return names
+
+
+def create_app(config_path=None, **overrides):
+    """Build a Flask app with the selected route sets over the shared model resources.
+    Serving state (history, drift, admission limits, caches) is per app, in app.extensions."""
+    config = load_config(config_path, **overrides)
+    names = selected_blueprints(config)
+
+    scaler_paths = config['SCALER_PATHS']
+    if isinstance(scaler_paths, str):
+        scaler_paths = scaler_paths.split(',')
+    shared = get_resources(
+        model_path=config['MODEL_PATH'] or None,
+        ensemble_config=config['ENSEMBLE_CONFIG'] or None,
+        scaler_paths=tuple(scaler_paths),
+        dataset_path=config['DATASET_PATH'] or None
+    )
+
+    app = Flask(__name__)
+    CORS(app)  # Allow requests from Node.js backend
+    app.config.update(config)
+    app.extensions['model_resources'] = shared
+
+    modules = _blueprint_modules()
+    # Enhanced first, so the legacy routes can share its admission limits, drift monitor and history
+    for name in sorted(names, key=['enhanced', 'legacy'].index):
+        module = modules[name]
+        module.configure(app, shared, config)
+        # Both sets define /health and /predict, so the legacy ones move under a prefix
+        prefix = config['LEGACY_URL_PREFIX'] if name == 'legacy' and 'enhanced' in names else None
+        app.register_blueprint(module.blueprint, url_prefix=prefix)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the prediction API variants from one process")
+    parser.add_argument('--config', help="JSON config file (default: $API_CONFIG)")
+    parser.add_argument('--blueprints', help="Comma-separated route sets: enhanced, legacy")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--debug', action='store_true')
+    args = parser.parse_args()
+
+    overrides = {'API_BLUEPRINTS': args.blueprints} if args.blueprints else {}
+    app = create_app(args.config, **overrides)
+    shared = app.extensions['model_resources']
+
+    print("=" * 60)
+    print("🚀 Starting Alzheimer's Prediction API...")
+    print("=" * 60)
+    print(f"📍 Model path: {shared.source}")
+    print(f"📊 Dataset path: {shared.dataset_path}")
+    print(f"🧩 Route sets: {app.config['API_BLUEPRINTS']}")
+    print(f"🌐 API will run on http://localhost:{args.port}")
+    print(f"\n📝 Endpoints:")
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if rule.endpoint != 'static':
+            methods = ','.join(sorted(rule.methods - {'HEAD', 'OPTIONS'}))
+            print(f"   - {methods:<5} {rule.rule}")
+    print("=" * 60)
+
+    app.run(host=args.host, port=args.port, debug=args.debug)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""
+Offline micro-benchmarks for the enhanced API's hot functions.
+Imports enhanced_model_api in-process with a DummyModel pickle and the bundled cohort
+(no server needed), then times each function on its own at several synthetic cohort
+sizes built by resampling the bundled dataset. Results are compared against a stored
+baseline and the run fails when a function regresses past the threshold.
+Usage:
+  python benchmark_functions.py [--sizes 2000,10000,100000,1000000]
+                                [--baseline benchmark_baseline.json] [--threshold 0.25]
+                                [--update-baseline] [--allow-missing-baseline] [--output results.json]
+Baselines are machine specific: record one with --update-baseline on the machine that
+runs the comparison (the machine profile is stored with it and checked on compare).
+Exits with code 0 when nothing regressed, 1 on a regression and 2 when there is no
+baseline to compare against, unless --allow-missing-baseline is given.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+here = os.path.dirname(os.path.abspath(__file__))
+if here not in sys.path:
+    sys.path.insert(0, here)
+
+from dummy_model import DummyModel  # noqa: E402
+
+DEFAULT_SIZES = [2000, 10000, 100000, 1000000]
+DEFAULT_BASELINE = os.path.join(here, 'benchmark_baseline.json')
+
+SAMPLE_INPUT = {
+    "age": 75,
+    "gender": 1,
+    "education": 16,
+    "apoe4": 1,
+    "mmse": 24,
+    "cdr": 0.5
+}
+
+
+def load_api():
+    """Build the enhanced app against a temporary DummyModel and the bundled cohort"""
+    from app_factory import create_app
+    # The pickle is only read while the app is built, so it is removed straight after
+    with tempfile.TemporaryDirectory(prefix='bench_') as tmp:
+        model_path = os.path.join(tmp, 'dummy_model.pkl')
+        joblib.dump(DummyModel(), model_path)
+        app = create_app(
+            API_BLUEPRINTS='enhanced',
+            MODEL_PATH=model_path,
+            ENSEMBLE_CONFIG='',
+            DATASET_PATH=os.environ.get('DATASET_PATH', os.path.join(here, 'alzheimers_disease_data.csv')),
+            # Keep the benchmark free of disk writes from the history store
+            HISTORY_DB_PATH=''
+        )
+    import enhanced_model_api
+    return enhanced_model_api, app
+
+
+def synthetic_cohort(base, n, seed=0):
+    """Resample the bundled cohort to n rows, jittering Age/MMSE so rows are not exact copies"""
+    rng = np.random.default_rng(seed)
+    cohort = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+    if 'Age' in cohort.columns:
+        cohort['Age'] = np.clip(cohort['Age'] + rng.integers(-2, 3, n), 60, 90)
+    if 'MMSE' in cohort.columns:
+        cohort['MMSE'] = np.clip(cohort['MMSE'] + rng.normal(0, 0.5, n), 0, 30)
+    return cohort
+
+
+def time_call(fn, min_seconds=0.2, min_runs=3, max_runs=200):
+    """Median and best seconds per call; calls slower than a second run once"""
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < max_runs:
+        t = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t)
+        if timings[0] > 1.0:
+            break
+        if len(timings) >= min_runs and time.perf_counter() - start >= min_seconds:
+            break
+    return {
+        "median_seconds": statistics.median(timings),
+        "min_seconds": min(timings),
+        "runs": len(timings),
+    }
+
+
+def build_benchmarks(api, serving):
+    """(name, scales_with_cohort, factory(cohort) -> zero-arg callable); serving is the app's EnhancedState"""
+    features = dict(SAMPLE_INPUT)
+    encoded = api.encode_features(features)
+    proba = float(serving.predict_positive_proba(encoded)[0][0])
+    analysis = api.analyze_against_dataset(features, serving.dataset, int(proba > 0.5))
+
+    def cohort_compare(cohort):
+        from cohort_scores import CohortScores
+        scores = CohortScores('bench', np.random.default_rng(1).random(len(cohort)), cohort, 0.0)
+        return lambda: scores.compare(features, proba)
+
+    return [
+        ("find_similar_patients", True,
+         lambda cohort: lambda: api.find_similar_patients(features, cohort, top_n=20)),
+        ("analyze_against_dataset", True,
+         lambda cohort: lambda: api.analyze_against_dataset(features, cohort, int(proba > 0.5))),
+        ("cohort_scores.compare", True, cohort_compare),
+        ("generate_recommendations", False,
+         lambda cohort: lambda: api.generate_recommendations(features, proba, analysis)),
+        ("encode_features", False,
+         lambda cohort: lambda: api.encode_features(features)),
+        # The serving path: fused scaler and ensemble fan-out included, as in /predict
+        ("predict_positive_proba", False,
+         lambda cohort: lambda: serving.predict_positive_proba(encoded)),
+    ]
+
+
+def run(api, serving, sizes, max_seconds=10.0):
+    """Time every benchmark; cohort-sized ones skip sizes where one call is projected to exceed max_seconds"""
+    results = {}
+    cohorts = {}
+    for name, scales, factory in build_benchmarks(api, serving):
+        results[name] = {}
+        if not scales:
+            results[name]["-"] = time_call(factory(serving.dataset))
+            print(f"  {name:<28} {results[name]['-']['median_seconds'] * 1000:10.3f} ms")
+            continue
+        previous = None
+        for size in sizes:
+            # Linear projection from the previous size (a lower bound for super-linear functions)
+            if previous is not None and previous[1] * size / previous[0] > max_seconds:
+                results[name][str(size)] = {"skipped": f"projected to take longer than {max_seconds}s per call"}
+                print(f"  {name:<28} n={size:<9} skipped")
+                continue
+            if size not in cohorts:
+                cohorts[size] = synthetic_cohort(serving.dataset, size)
+            timing = time_call(factory(cohorts[size]))
+            results[name][str(size)] = timing
+            print(f"  {name:<28} n={size:<9} {timing['median_seconds'] * 1000:10.3f} ms")
+            previous = (size, timing["median_seconds"])
+    return results
+
+
+def machine_profile():
+    """What the timings depend on; stored with a baseline and checked against it"""
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "system": platform.system(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+    }
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """
+    Regressions beyond threshold (relative) and min_delta_ms (absolute noise floor).
+    Best-of-runs times are compared, as they are the least sensitive to machine noise.
+    """
+    failures = []
+    for name, sizes in results.items():
+        for size, timing in sizes.items():
+            old = baseline.get(name, {}).get(size)
+            if not old or "min_seconds" not in old or "min_seconds" not in timing:
+                continue
+            new_s, old_s = timing["min_seconds"], old["min_seconds"]
+            if (new_s - old_s) * 1000 < min_delta_ms or old_s == 0:
+                continue
+            change = (new_s - old_s) / old_s
+            if change > threshold:
+                failures.append(f"{name} n={size}: {old_s * 1000:.3f} ms -> {new_s * 1000:.3f} ms "
+                                f"(+{change * 100:.0f}%)")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmark the enhanced API's hot functions")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Comma separated synthetic cohort sizes")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed relative slowdown versus the baseline (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.1,
+                        help="Ignore slowdowns smaller than this many milliseconds")
+    parser.add_argument("--max-seconds", type=float, default=10.0,
+                        help="Skip cohort sizes where one call is projected to take longer than this")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--allow-missing-baseline", action="store_true",
+                        help="Exit 0 instead of 2 when there is no baseline to compare against")
+    parser.add_argument("--output", default=None, help="Also write the results JSON here")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    api, app = load_api()
+    print("\n" + "=" * 60)
+    print("FUNCTION BENCHMARKS")
+    print("=" * 60)
+    results = run(api, app.extensions['enhanced_api'], sizes, max_seconds=args.max_seconds)
+    report = dict(machine_profile(), timestamp=time.strftime('%Y-%m-%dT%H:%M:%S'), results=results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\n{'⚠️' if args.allow_missing_baseline else '❌'} No baseline at {args.baseline}; "
+              f"run with --update-baseline to record one")
+        return 0 if args.allow_missing_baseline else 2
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    profile = machine_profile()
+    differs = {k: (baseline.get(k), v) for k, v in profile.items() if baseline.get(k) != v}
+    if differs:
+        print(f"⚠️ Baseline was recorded on a different machine profile: {differs}")
+    failures = compare(results, baseline["results"], args.threshold, args.min_delta_ms)
+    for failure in failures:
+        print('❌ Regression:', failure)
+    print('\nBENCHMARK RESULT: ', 'OK' if not failures else 'REGRESSED')
+    return 0 if not failures else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
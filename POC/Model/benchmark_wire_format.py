@@ -0,0 +1,111 @@
+"""
+JSON vs binary columnar payloads for /predict-batch.
+Runs the API in-process (Flask test client, DummyModel, see benchmark_functions.py) and,
+for each batch size and wire format, times the server-side decode into a feature frame
+and the full round trip (client encode, request, response decode), and reports body sizes.
+Usage:
+  python benchmark_wire_format.py [--sizes 1,100,10000] [--output results.json]
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+here = os.path.dirname(os.path.abspath(__file__))
+if here not in sys.path:
+    sys.path.insert(0, here)
+
+import wire_format  # noqa: E402
+from benchmark_functions import SAMPLE_INPUT, load_api, synthetic_cohort, time_call  # noqa: E402
+
+DEFAULT_SIZES = [1, 100, 10000]
+
+
+def batch_columns(api, serving, n):
+    """{request key: float64 array} for n patients resampled from the bundled cohort"""
+    cohort = synthetic_cohort(serving.dataset, n)
+    columns = {}
+    for key, value in SAMPLE_INPUT.items():
+        column = api.FEATURE_ALIASES.get(key)
+        if column in cohort.columns:
+            columns[key] = cohort[column].to_numpy(dtype=np.float64)
+        else:
+            columns[key] = np.full(n, float(value))
+    return columns
+
+
+def client_codecs():
+    """media type -> (encode request body, decode response body)"""
+    def json_encode(columns):
+        rows = [dict(zip(columns, values)) for values in zip(*(c.tolist() for c in columns.values()))]
+        return json.dumps({"rows": rows}).encode('utf-8')
+
+    def json_decode(body):
+        return {k: np.asarray(v) for k, v in json.loads(body)["columns"].items()}
+
+    codecs = {
+        wire_format.MEDIA_JSON: (json_encode, json_decode),
+        wire_format.MEDIA_TYPED_COLUMNS: (wire_format.encode_columns, wire_format.decode_columns),
+    }
+    if wire_format.pa is not None:
+        def arrow_decode(body):
+            table = wire_format.pa.ipc.open_stream(body).read_all()
+            return {name: table.column(name).to_numpy() for name in table.column_names}
+        codecs[wire_format.MEDIA_ARROW] = (
+            lambda columns: wire_format.encode_batch(columns, wire_format.MEDIA_ARROW), arrow_decode)
+    return codecs
+
+
+def run(api, app, sizes):
+    client = app.test_client()
+    results = {}
+    for n in sizes:
+        columns = batch_columns(api, app.extensions['enhanced_api'], n)
+        results[str(n)] = {}
+        for media_type, (encode, decode) in client_codecs().items():
+            body = encode(columns)
+
+            def round_trip():
+                response = client.post('/predict-batch', data=encode(columns),
+                                       headers={'Content-Type': media_type, 'Accept': media_type})
+                assert response.status_code == 200, response.data[:200]
+                return decode(response.data)
+
+            response_bytes = len(client.post('/predict-batch', data=body, headers={
+                'Content-Type': media_type, 'Accept': media_type}).data)
+            decode_timing = time_call(lambda: wire_format.decode_batch(body, media_type))
+            trip_timing = time_call(round_trip)
+            results[str(n)][media_type] = {
+                "request_bytes": len(body),
+                "response_bytes": response_bytes,
+                "server_decode_ms": decode_timing["median_seconds"] * 1000,
+                "round_trip_ms": trip_timing["median_seconds"] * 1000,
+            }
+            print(f"  n={n:<7} {media_type:<36} req {len(body):>9} B  resp {response_bytes:>8} B  "
+                  f"decode {decode_timing['median_seconds'] * 1000:9.3f} ms  "
+                  f"round trip {trip_timing['median_seconds'] * 1000:9.3f} ms")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare JSON and binary batch payloads for /predict-batch")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Comma separated batch sizes")
+    parser.add_argument("--output", default=None, help="Also write the results JSON here")
+    args = parser.parse_args(argv)
+
+    api, app = load_api()
+    print("\n" + "=" * 60)
+    print("WIRE FORMAT BENCHMARK (/predict-batch)")
+    print("=" * 60)
+    results = run(api, app, [int(s) for s in args.sizes.split(',') if s.strip()])
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
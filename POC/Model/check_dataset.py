@@ -1,32 +1,54 @@
+"""
+Print summary information for a dataset CSV without loading it into memory.
+Statistics come from one chunked pass of the streaming statistics engine
+(streaming_stats.py), with chunks summarised on several processes.
+Usage:
+  python check_dataset.py [path/to/data.csv] [--chunksize N] [--workers N]
+"""
+import argparse
+
 import pandas as pd
 
-# Load the dataset
-df = pd.read_csv('alzheimers_disease_data.csv')
-
-print("=" * 60)
-print("DATASET INFORMATION")
-print("=" * 60)
-print(f"\nColumns: {df.columns.tolist()}")
-print(f"\nDataset shape: {df.shape}")
-print(f"Total rows: {df.shape[0]}")
-print(f"Total columns: {df.shape[1]}")
-
-print("\n" + "=" * 60)
-print("FIRST 5 ROWS")
-print("=" * 60)
-print(df.head())
-
-print("\n" + "=" * 60)
-print("DATA TYPES")
-print("=" * 60)
-print(df.dtypes)
-
-print("\n" + "=" * 60)
-print("BASIC STATISTICS")
-print("=" * 60)
-print(df.describe())
-
-print("\n" + "=" * 60)
-print("MISSING VALUES")
-print("=" * 60)
-print(df.isnull().sum())
+from streaming_stats import DEFAULT_CHUNKSIZE, compute_stats, default_workers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise a dataset CSV in a single streaming pass")
+    parser.add_argument("path", nargs="?", default='alzheimers_disease_data.csv')
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    args = parser.parse_args(argv)
+
+    summary = compute_stats(args.path, chunksize=args.chunksize, workers=args.workers).summary()
+
+    print("=" * 60)
+    print("DATASET INFORMATION")
+    print("=" * 60)
+    print(f"\nColumns: {summary['columns']}")
+    print(f"\nDataset shape: ({summary['total_rows']}, {len(summary['columns'])})")
+    print(f"Total rows: {summary['total_rows']}")
+    print(f"Total columns: {len(summary['columns'])}")
+
+    print("\n" + "=" * 60)
+    print("FIRST 5 ROWS")
+    print("=" * 60)
+    print(pd.read_csv(args.path, nrows=5))
+
+    print("\n" + "=" * 60)
+    print("DATA TYPES")
+    print("=" * 60)
+    print(pd.Series(summary['data_types']))
+
+    print("\n" + "=" * 60)
+    print("BASIC STATISTICS")
+    print("=" * 60)
+    print(pd.DataFrame(summary['basic_stats']))
+
+    print("\n" + "=" * 60)
+    print("MISSING VALUES")
+    print("=" * 60)
+    print(pd.Series(summary['missing_values']))
+
+
+if __name__ == '__main__':
+    main()
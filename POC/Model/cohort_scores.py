@@ -0,0 +1,152 @@
+"""
+Pre-scored reference cohort.
+The whole reference dataset is scored once, in a background thread started when the model
+is loaded (the served model does not change while the process runs), and the probabilities are kept as a sorted array next to the cohort, so a patient's risk
+percentile is a binary search and the mean predicted risk of their nearest neighbours is
+a KD-tree query - both O(log n) per request instead of rescoring every row.
+"""
+import threading
+import time
+
+import numpy as np
+from sklearn.neighbors import KDTree
+
+# Dataset column -> request key used to place a patient among the cohort (as in find_similar_patients)
+NEIGHBOUR_FEATURES = {'Age': 'age', 'MMSE': 'mmse'}
+
+
+class CohortScores:
+    """Model probabilities for every cohort row plus lookup structures built from them"""
+
+    def __init__(self, version, proba, dataset, score_seconds):
+        self.version = version
+        self.proba = np.asarray(proba, dtype=np.float64)
+        self.sorted_proba = np.sort(self.proba)
+        self.score_seconds = score_seconds
+        self.scored_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+
+        # Range-normalised neighbour space, matching find_similar_patients
+        self.columns = [c for c in NEIGHBOUR_FEATURES if c in dataset.columns]
+        self.tree = None
+        if self.columns:
+            points = dataset[self.columns].to_numpy(dtype=np.float64)
+            self.offset = points.min(axis=0)
+            ranges = points.max(axis=0) - self.offset
+            self.scale = np.where(ranges > 0, ranges, 1.0)
+            self.tree = KDTree((points - self.offset) / self.scale)
+
+    def percentile(self, probability):
+        """Percentage of the cohort the model scores below this probability"""
+        n = len(self.sorted_proba)
+        if n == 0:
+            return None
+        return float(np.searchsorted(self.sorted_proba, probability, side='left') / n * 100)
+
+    def neighbour_risk(self, input_data, k=20):
+        """Mean and spread of predicted risk among the k nearest cohort patients"""
+        if self.tree is None:
+            return None
+        point = np.array([[float(input_data.get(NEIGHBOUR_FEATURES[c], 0)) for c in self.columns]])
+        k = min(k, len(self.proba))
+        _, idx = self.tree.query((point - self.offset) / self.scale, k=k)
+        neighbours = self.proba[idx[0]]
+        return {
+            "count": int(k),
+            "mean_predicted_risk": float(neighbours.mean()),
+            "min_predicted_risk": float(neighbours.min()),
+            "max_predicted_risk": float(neighbours.max()),
+        }
+
+    def compare(self, input_data, probability, k=20):
+        """Model-based comparison block for /predict-enhanced"""
+        percentile = self.percentile(probability)
+        return {
+            "model_version": self.version,
+            "risk_percentile": percentile,
+            "cohort_mean_predicted_risk": float(self.proba.mean()),
+            "nearest_neighbours": self.neighbour_risk(input_data, k=k),
+            "interpretation": f"Predicted risk is higher than {percentile:.1f}% of patients in the dataset",
+        }
+
+
+class CohortScorer:
+    """
+    Holds the CohortScores of the served model, scored in the background when the model is loaded.
+    Requests only read the result; a failed scoring is reported (failure()) until the next start().
+    """
+
+    def __init__(self, dataset, batch_size=50000):
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.scores = None
+        self.pending_version = None
+        self.last_error = None
+        self.failed_version = None
+        self.runs = 0
+
+    def _score(self, version, score_fn):
+        with self.lock:
+            self.runs += 1
+        try:
+            start = time.perf_counter()
+            parts = [
+                np.asarray(score_fn(self.dataset.iloc[i:i + self.batch_size]), dtype=np.float64)
+                for i in range(0, len(self.dataset), self.batch_size)
+            ]
+            proba = np.concatenate(parts) if parts else np.empty(0)
+            scores = CohortScores(version, proba, self.dataset, time.perf_counter() - start)
+            with self.lock:
+                self.scores = scores
+                self.last_error = None
+                self.failed_version = None
+            print(f"✅ Cohort scored for model {version}: {len(proba)} rows in {scores.score_seconds:.2f}s")
+        except Exception as e:
+            with self.lock:
+                self.last_error = str(e)
+                self.failed_version = version
+            print(f"❌ Error scoring cohort: {e}")
+        finally:
+            with self.lock:
+                if self.pending_version == version:
+                    self.pending_version = None
+
+    def start(self, version, score_fn, background=True):
+        """Score the cohort for this model version unless it is already scored or in progress"""
+        with self.lock:
+            if self.dataset is None or self.pending_version == version:
+                return
+            if self.scores is not None and self.scores.version == version:
+                return
+            self.pending_version = version
+        if background:
+            threading.Thread(target=self._score, args=(version, score_fn), daemon=True,
+                             name='cohort-scorer').start()
+        else:
+            self._score(version, score_fn)
+
+    def failure(self, version):
+        """Error of the scoring run for this version if it failed, else None"""
+        with self.lock:
+            return self.last_error if self.failed_version == version else None
+
+    def current(self, version):
+        """Scores for this model version, or None while they are being computed"""
+        with self.lock:
+            if self.scores is not None and self.scores.version == version:
+                return self.scores
+            return None
+
+    def status(self):
+        with self.lock:
+            scores = self.scores
+            return {
+                "model_version": scores.version if scores else None,
+                "rows": int(len(scores.proba)) if scores else 0,
+                "scored_at": scores.scored_at if scores else None,
+                "score_seconds": scores.score_seconds if scores else None,
+                "scoring_version": self.pending_version,
+                "scoring_runs": self.runs,
+                "last_error": self.last_error,
+                "failed_version": self.failed_version,
+            }
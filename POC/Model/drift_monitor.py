@@ -0,0 +1,176 @@
+"""
+Streaming input drift monitor.
+For every monitored feature the reference cohort is binned once (quantile edges, or one
+bin per value for discrete features). Live requests only increment a fixed-size count
+array - O(1) per request and bounded memory whatever the traffic. Counts are kept in two
+rotating windows so the distances track recent traffic. PSI and a binned KS statistic
+against the cohort histograms are recomputed at most once per interval.
+"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from feature_encoding import FEATURE_ALIASES, resolve_column
+
+PSI_EPSILON = 1e-4
+
+
+def bin_edges(values, bins=10):
+    """Inner bin edges: midpoints for discrete features, quantiles for continuous ones"""
+    unique = np.unique(values)
+    if len(unique) <= bins:
+        return (unique[:-1] + unique[1:]) / 2
+    return np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+
+
+def psi(expected, actual):
+    """Population stability index between two proportion vectors"""
+    e = np.clip(expected, PSI_EPSILON, None)
+    a = np.clip(actual, PSI_EPSILON, None)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def ks_distance(expected, actual):
+    """Largest gap between the two binned cumulative distributions"""
+    return float(np.max(np.abs(np.cumsum(expected) - np.cumsum(actual))))
+
+
+def psi_status(value):
+    if value < 0.1:
+        return "stable"
+    if value < 0.25:
+        return "moderate"
+    return "significant"
+
+
+class FeatureHistogram:
+    """Reference proportions and rotating live counts for one feature"""
+
+    def __init__(self, key, column, reference_values, bins=10):
+        self.key = key
+        self.column = column
+        self.edges = bin_edges(reference_values, bins)
+        counts = np.bincount(np.searchsorted(self.edges, reference_values, side='right'),
+                             minlength=len(self.edges) + 1)
+        self.reference = counts / counts.sum()
+        self.current = np.zeros(len(self.edges) + 1, dtype=np.int64)
+        self.previous = np.zeros(len(self.edges) + 1, dtype=np.int64)
+        self.missing = 0
+
+    def add(self, value):
+        try:
+            x = float(value)
+        except (TypeError, ValueError):
+            self.missing += 1
+            return
+        if np.isnan(x):
+            self.missing += 1
+            return
+        self.current[np.searchsorted(self.edges, x, side='right')] += 1
+
+
+class DriftMonitor:
+    """Tracks live request feature distributions against the reference cohort"""
+
+    def __init__(self, dataset, keys=None, bins=10, window_size=5000, interval_seconds=60):
+        self.lock = threading.Lock()
+        self.window_size = window_size
+        self.interval_seconds = interval_seconds
+        self.window_count = 0
+        self.total = 0
+        self.report = None
+        self.report_time = 0.0
+
+        self.features = {}
+        monitored = set()
+        for key in (keys or FEATURE_ALIASES.keys()):
+            column = resolve_column(key, dataset.columns)
+            # One histogram per dataset column: the first key resolving to it wins
+            if column is None or column in monitored:
+                continue
+            monitored.add(column)
+            values = pd.to_numeric(dataset[column], errors='coerce').dropna().to_numpy(dtype=np.float64)
+            if len(values):
+                self.features[key] = FeatureHistogram(key, column, values, bins)
+
+    def record(self, input_data):
+        """Count one request's feature values; rotates the window every window_size requests"""
+        with self.lock:
+            for key, hist in self.features.items():
+                if key in input_data:
+                    hist.add(input_data[key])
+                else:
+                    hist.missing += 1
+            self._advance(1)
+
+    def record_batch(self, frame):
+        """Count a whole batch of requests (one row each) with vectorised binning"""
+        n = len(frame)
+        with self.lock:
+            for key, hist in self.features.items():
+                if key not in frame.columns:
+                    hist.missing += n
+                    continue
+                x = pd.to_numeric(frame[key], errors='coerce').to_numpy(dtype=np.float64)
+                x = x[~np.isnan(x)]
+                hist.missing += n - len(x)
+                hist.current += np.bincount(np.searchsorted(hist.edges, x, side='right'),
+                                            minlength=len(hist.current))
+            self._advance(n)
+
+    def _advance(self, n):
+        self.total += n
+        self.window_count += n
+        if self.window_count >= self.window_size:
+            for hist in self.features.values():
+                hist.previous = hist.current
+                hist.current = np.zeros_like(hist.previous)
+            self.window_count = 0
+
+    def _compute(self):
+        features = {}
+        for key, hist in self.features.items():
+            live = hist.current + hist.previous
+            n = int(live.sum())
+            entry = {"column": hist.column, "observations": n, "missing": hist.missing}
+            if n:
+                actual = live / n
+                value = psi(hist.reference, actual)
+                entry.update({
+                    "psi": value,
+                    "ks": ks_distance(hist.reference, actual),
+                    "status": psi_status(value),
+                })
+            features[key] = entry
+        scored = [f["psi"] for f in features.values() if "psi" in f]
+        return {
+            "computed_at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "requests_seen": self.total,
+            "window_size": self.window_size,
+            "max_psi": max(scored) if scored else None,
+            "status": psi_status(max(scored)) if scored else "no data",
+            "features": features,
+        }
+
+    def snapshot(self, force=False):
+        """Latest drift report, recomputed when older than interval_seconds"""
+        with self.lock:
+            if force or self.report is None or time.time() - self.report_time >= self.interval_seconds:
+                self.report = self._compute()
+                self.report_time = time.time()
+            return self.report
+
+    def reference_histograms(self):
+        """Bin edges and cohort proportions, for plotting against live traffic"""
+        with self.lock:
+            return {
+                key: {
+                    "column": hist.column,
+                    "edges": hist.edges.tolist(),
+                    "reference": hist.reference.tolist(),
+                    "live": (hist.current + hist.previous).tolist(),
+                }
+                for key, hist in self.features.items()
+            }
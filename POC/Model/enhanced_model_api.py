@@ -1,125 +1,192 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import joblib
+from flask import Blueprint, current_app, request, jsonify
 import pandas as pd
 import numpy as np
+import functools
 import os
-import sys
-
-# Paths
-# Allow overriding the model path with an environment variable for portability
-MODEL_PATH = os.environ.get('MODEL_PATH')
-DATASET_PATH = os.environ.get('DATASET_PATH', "alzheimers_disease_data.csv")
-
-# If the dataset path isn't absolute or doesn't exist in cwd, try relative to this file
-if not os.path.isabs(DATASET_PATH) and not os.path.exists(DATASET_PATH):
-    candidate_dataset = os.path.join(os.path.dirname(__file__), DATASET_PATH)
-    if os.path.exists(candidate_dataset):
-        DATASET_PATH = candidate_dataset
-
-# If MODEL_PATH not provided, try common relative locations or search for a .pkl in known dirs
-if not MODEL_PATH:
-    # common relative location used in project structure
-    candidate = os.path.join(os.path.dirname(__file__), 'test_models', 'catboost_alzheimers_model.pkl')
-    if os.path.exists(candidate):
-        MODEL_PATH = candidate
-    else:
-        # search for any .pkl under Model/test_models or current Model directory
-        search_dirs = [
-            os.path.join(os.path.dirname(__file__), 'test_models'),
-            os.path.dirname(__file__)
-        ]
-        found = None
-        for d in search_dirs:
+
+from admission_control import AdmissionController, AdmissionRejected, configured_classes, rejection_response
+from drift_monitor import DriftMonitor
+from ensemble import EnsembleModel, EnsembleTimeoutError
+from feature_encoding import FEATURE_ALIASES, get_feature_names
+from fused_scaler import ScalingError
+from prediction_history import PredictionHistory, parse_timestamp, trend_summary
+from request_coalescing import SingleFlight, make_key
+from streaming_stats import compute_stats
+from what_if import ResultCache, build_grid, parse_sweeps, sweep_result
+from wire_format import MEDIA_JSON, WireFormatError, decode_batch, encode_batch, supported_media_types
+
+# Enhanced route set. app_factory.create_app loads the shared model/cohort resources once,
+# calls configure() and mounts this blueprint; run this file to serve it on its own.
+blueprint = Blueprint('enhanced', __name__)
+
+
+class EnhancedState:
+    """Per-app serving state: the shared model resources plus this app's history, drift monitor,
+    admission limits and caches. Kept in app.extensions so every create_app() is independent."""
+
+    def __init__(self, shared, config):
+        # The reference cohort is only loaded (and pre-scored) for apps serving these routes
+        shared.load_cohort()
+        self.resources = shared
+        self.model = shared.model
+        self.dataset = shared.dataset
+        self.scaler = shared.scaler
+        self.model_version = shared.model_version
+        self.dataset_path = shared.dataset_path
+        self.cohort_scorer = shared.cohort_scorer
+        # Worker processes used by the streaming statistics engine for /dataset-info
+        self.stats_workers = int(config['STATS_WORKERS'])
+        # Largest number of rows accepted by /predict-batch
+        self.max_batch_rows = int(config['MAX_BATCH_ROWS'])
+        # Largest perturbation grid for /what-if
+        self.what_if_max_points = int(config['WHAT_IF_MAX_POINTS'])
+
+        # Identical concurrent /predict-enhanced requests share a single computation
+        self.coalescer = SingleFlight()
+        # Bounded concurrency and wait queues per endpoint class (light / heavy / batch)
+        self.admission = AdmissionController(configured_classes(config),
+                                             max_total=int(config['ADMISSION_MAX_CONCURRENT']))
+        # /what-if responses per patient payload and model version
+        self.what_if_cache = ResultCache(max_entries=int(config['WHAT_IF_CACHE_SIZE']))
+        # /dataset-info summary, recomputed only when the dataset file changes
+        self.dataset_stats = {"key": None, "stats": None}
+
+        # Open prediction history store (an empty path disables it)
+        self.history = None
+        if config['HISTORY_DB_PATH']:
             try:
-                if os.path.isdir(d):
-                    for fname in os.listdir(d):
-                        if fname.lower().endswith('.pkl'):
-                            found = os.path.join(d, fname)
-                            break
-            except Exception:
-                continue
-            if found:
-                break
-
-        MODEL_PATH = found
-
-# Load model
-try:
-    # Make sure the Model directory is importable so unpickling can find custom classes
-    model_dir = os.path.dirname(__file__)
-    if model_dir not in sys.path:
-        sys.path.insert(0, model_dir)
-    # Try import of local dummy_model (no-op if not present)
-    try:
-        import dummy_model  # noqa: F401
-    except Exception:
-        pass
-    model = joblib.load(MODEL_PATH)
-    print(f"✅ Model loaded successfully from {MODEL_PATH}")
-except Exception as e:
-    print(f"❌ Error loading model: {e}")
-    model = None
-
-# Load dataset
-try:
-    dataset = pd.read_csv(DATASET_PATH)
-    print(f"✅ Dataset loaded successfully: {dataset.shape[0]} rows, {dataset.shape[1]} columns")
-    print(f"📊 Dataset columns: {dataset.columns.tolist()}")
-except Exception as e:
-    print(f"❌ Error loading dataset: {e}")
-    dataset = None
-
-# Create app
-app = Flask(__name__)
-CORS(app)
-
-@app.route('/health', methods=['GET'])
+                self.history = PredictionHistory(config['HISTORY_DB_PATH'])
+                print(f"✅ Prediction history store opened at {config['HISTORY_DB_PATH']}")
+            except Exception as e:
+                print(f"❌ Error opening prediction history store: {e}")
+
+        # Live input distributions compared against the cohort (fixed-size histograms)
+        self.drift_monitor = None
+        if self.dataset is not None:
+            # The model's own feature names first, so a cohort column is monitored under the key the
+            # model receives (Age, not the age alias); aliases only cover columns the model lacks
+            drift_keys = list(get_feature_names(self.model) or []) if self.model is not None else []
+            drift_keys += [f for f in FEATURE_ALIASES if f not in drift_keys]
+            self.drift_monitor = DriftMonitor(
+                self.dataset,
+                keys=drift_keys,
+                window_size=int(config['DRIFT_WINDOW_SIZE']),
+                interval_seconds=float(config['DRIFT_INTERVAL_SECONDS'])
+            )
+
+    def predict_positive_proba(self, df):
+        """Positive-class probabilities, plus member details when serving an ensemble"""
+        return self.resources.predict_positive_proba(df)
+
+
+def configure(app, shared, config):
+    """Create this app's serving state over the shared resources"""
+    app.extensions['enhanced_api'] = EnhancedState(shared, config)
+
+def state():
+    """Serving state of the app handling the current request"""
+    return current_app.extensions['enhanced_api']
+
+def limit(name):
+    """
+    Route decorator: admit the request under the current app's admission controller.
+    Coalesced routes skip it and admit only the single-flight leader (see admitted_once)
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            return state().admission.call(name, lambda: view(*args, **kwargs))
+        return wrapper
+    return decorator
+
+def admitted_once(s, key, name, fn):
+    """
+    Single-flight first, admission second: only the leader for a key takes a slot in the
+    endpoint class; identical requests wait for its result without holding or queueing for one
+    """
+    return s.coalescer.do(key, lambda: s.admission.run(name, fn))
+
+def split_patient_id(data):
+    """Separate the optional PatientID from the model features"""
+    features = {k: v for k, v in data.items() if k != 'PatientID'}
+    return data.get('PatientID'), features
+
+def encode_features(features):
+    """Turn one request's feature dict into the single-row frame the model scores"""
+    return pd.DataFrame([features])
+
+def record_prediction(patient_id, endpoint, proba, prediction, risk_level, features):
+    """Feed the drift monitor and, when it has a PatientID, queue the prediction for the history store
+    (written off the request path)"""
+    s = state()
+    if s.drift_monitor is not None:
+        s.drift_monitor.record(features)
+    if s.history is not None:
+        s.history.record(patient_id, endpoint, s.model_version, proba, prediction, risk_level, features)
+
+@blueprint.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
+    s = state()
     return jsonify({
         "status": "healthy",
-        "model_loaded": model is not None,
-        "dataset_loaded": dataset is not None,
-        "dataset_size": len(dataset) if dataset is not None else 0
+        "model_loaded": s.model is not None,
+        "dataset_loaded": s.dataset is not None,
+        "dataset_size": len(s.dataset) if s.dataset is not None else 0
     })
 
-@app.route('/dataset-info', methods=['GET'])
+def dataset_file_stats():
+    """Single chunked pass over the dataset file (cached per file size/mtime)"""
+    s = state()
+    stat = os.stat(s.dataset_path)
+    key = (stat.st_size, stat.st_mtime_ns)
+    if s.dataset_stats["key"] != key:
+        summary = compute_stats(s.dataset_path, workers=s.stats_workers).summary()
+        s.dataset_stats.update(key=key, stats=summary)
+    return s.dataset_stats["stats"]
+
+@blueprint.route('/dataset-info', methods=['GET'])
 def dataset_info():
     """Get dataset statistics and information"""
-    if dataset is None:
+    s = state()
+    if not s.dataset_path or not os.path.exists(s.dataset_path):
         return jsonify({"error": "Dataset not loaded"}), 500
     
     try:
-        # Basic statistics
+        # Basic statistics from one streaming pass (quantiles are approximate on high-cardinality columns)
+        summary = admitted_once(s, 'dataset-info', 'heavy', dataset_file_stats)
         stats = {
-            "total_patients": len(dataset),
-            "columns": dataset.columns.tolist(),
-            "data_types": dataset.dtypes.astype(str).to_dict(),
-            "missing_values": dataset.isnull().sum().to_dict(),
-            "basic_stats": dataset.describe().to_dict()
+            "total_patients": summary["total_rows"],
+            "columns": summary["columns"],
+            "data_types": summary["data_types"],
+            "missing_values": summary["missing_values"],
+            "basic_stats": summary["basic_stats"],
+            "value_distributions": summary["value_distributions"]
         }
         
         # If diagnosis column exists, get distribution
-        if 'Diagnosis' in dataset.columns:
-            stats["diagnosis_distribution"] = dataset['Diagnosis'].value_counts().to_dict()
+        if 'Diagnosis' in summary["value_distributions"]:
+            stats["diagnosis_distribution"] = summary["value_distributions"]["Diagnosis"]
         
         return jsonify({
             "success": True,
             "data": stats
         })
+    except AdmissionRejected as e:
+        return rejection_response(e)
     except Exception as e:
         return jsonify({
             "success": False,
             "error": str(e)
         }), 500
 
-@app.route('/predict-enhanced', methods=['POST'])
+@blueprint.route('/predict-enhanced', methods=['POST'])
 def predict_enhanced():
     """
     Enhanced prediction with dataset context and detailed analysis
-    Expected JSON format:
+    Expected JSON format (PatientID is optional and only used for the history):
     {
+        "PatientID": "4751",
         "age": 75,
         "gender": 1,
         "education": 16,
@@ -128,13 +195,14 @@ def predict_enhanced():
         "cdr": 0.5
     }
     """
+    s = state()
     try:
-        if model is None:
+        if s.model is None:
             return jsonify({
                 "error": "Model not loaded"
             }), 500
         
-        if dataset is None:
+        if s.dataset is None:
             return jsonify({
                 "error": "Dataset not loaded"
             }), 500
@@ -145,45 +213,19 @@ def predict_enhanced():
                 "error": "No data provided"
             }), 400
 
-        # Convert to DataFrame for prediction
-        input_df = pd.DataFrame([data])
-        
-        # Make prediction
-        proba = model.predict_proba(input_df)[:, 1][0]
-        prediction = int(proba > 0.5)
-        
-        # Risk level classification
-        if proba < 0.3:
-            risk_level = "Low Risk"
-            risk_color = "green"
-        elif proba < 0.7:
-            risk_level = "Moderate Risk"
-            risk_color = "orange"
-        else:
-            risk_level = "High Risk"
-            risk_color = "red"
-        
-        # Dataset-based analysis
-        dataset_analysis = analyze_against_dataset(data, dataset, prediction)
-        
-        # Recommendations based on risk
-        recommendations = generate_recommendations(data, proba, dataset_analysis)
-        
-        return jsonify({
-            "success": True,
-            "prediction": {
-                "result": prediction,
-                "probability": float(proba),
-                "probability_percentage": float(proba * 100),
-                "risk_level": risk_level,
-                "risk_color": risk_color,
-                "diagnosis": "Alzheimer's Disease" if prediction == 1 else "Healthy"
-            },
-            "dataset_analysis": dataset_analysis,
-            "recommendations": recommendations,
-            "input_data": data
-        })
+        key = make_key('predict-enhanced', data, s.model_version)
+        return jsonify(admitted_once(s, key, 'heavy', lambda: compute_enhanced_prediction(data)))
 
+    except AdmissionRejected as e:
+        return rejection_response(e)
+    except ScalingError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except EnsembleTimeoutError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "message": "Prediction exceeded the latency budget"
+        }), 503
     except Exception as e:
         return jsonify({
             "success": False,
@@ -191,6 +233,73 @@ def predict_enhanced():
             "message": "Error during enhanced prediction"
         }), 500
 
+def compute_enhanced_prediction(data):
+    """Build the full /predict-enhanced response for one patient payload"""
+    s = state()
+    patient_id, features = split_patient_id(data)
+
+    # Convert to DataFrame for prediction
+    input_df = encode_features(features)
+
+    # Make prediction
+    proba, ensemble_info = s.predict_positive_proba(input_df)
+    proba = proba[0]
+    prediction = int(proba > 0.5)
+
+    # Risk level classification
+    if proba < 0.3:
+        risk_level = "Low Risk"
+        risk_color = "green"
+    elif proba < 0.7:
+        risk_level = "Moderate Risk"
+        risk_color = "orange"
+    else:
+        risk_level = "High Risk"
+        risk_color = "red"
+
+    # Dataset-based analysis
+    dataset_analysis = analyze_against_dataset(features, s.dataset, prediction)
+
+    # Where the model places this patient among the cohort scored at startup
+    cohort_scores = s.cohort_scorer.current(s.model_version)
+    cohort_error = s.cohort_scorer.failure(s.model_version)
+    if cohort_scores is not None:
+        dataset_analysis["model_risk_comparison"] = cohort_scores.compare(features, proba)
+    elif cohort_error is not None:
+        dataset_analysis["model_risk_comparison"] = {
+            "status": "unavailable",
+            "error": cohort_error,
+            "interpretation": "The reference cohort could not be scored with this model"
+        }
+    else:
+        dataset_analysis["model_risk_comparison"] = {
+            "status": "scoring",
+            "interpretation": "The reference cohort is still being scored for this model"
+        }
+
+    # Recommendations based on risk
+    recommendations = generate_recommendations(features, proba, dataset_analysis)
+
+    record_prediction(patient_id, 'predict-enhanced', proba, prediction, risk_level, features)
+
+    response = {
+        "success": True,
+        "prediction": {
+            "result": prediction,
+            "probability": float(proba),
+            "probability_percentage": float(proba * 100),
+            "risk_level": risk_level,
+            "risk_color": risk_color,
+            "diagnosis": "Alzheimer's Disease" if prediction == 1 else "Healthy"
+        },
+        "dataset_analysis": dataset_analysis,
+        "recommendations": recommendations,
+        "input_data": data
+    }
+    if ensemble_info is not None:
+        response["ensemble"] = ensemble_info
+    return response
+
 def analyze_against_dataset(input_data, dataset, prediction):
     """Analyze input against the dataset to provide context"""
     try:
@@ -312,18 +421,23 @@ def find_similar_patients(input_data, dataset, top_n=20):
     except Exception as e:
         return {"error": f"Error finding similar patients: {str(e)}"}
 
+# Probability above which the risk-based recommendation becomes Important / Urgent
+RISK_BAND_IMPORTANT = 0.4
+RISK_BAND_URGENT = 0.7
+RECOMMENDATION_BANDS = [("Preventive", None), ("Important", RISK_BAND_IMPORTANT), ("Urgent", RISK_BAND_URGENT)]
+
 def generate_recommendations(input_data, probability, dataset_analysis):
     """Generate personalized recommendations based on prediction and dataset analysis"""
     recommendations = []
     
     # Risk-based recommendations
-    if probability > 0.7:
+    if probability > RISK_BAND_URGENT:
         recommendations.append({
             "category": "Urgent",
             "title": "Immediate Medical Consultation",
             "description": "High risk detected. Please consult with a neurologist as soon as possible for comprehensive evaluation."
         })
-    elif probability > 0.4:
+    elif probability > RISK_BAND_IMPORTANT:
         recommendations.append({
             "category": "Important",
             "title": "Schedule Medical Checkup",
@@ -367,13 +481,15 @@ def generate_recommendations(input_data, probability, dataset_analysis):
     
     return recommendations
 
-@app.route('/predict', methods=['POST'])
+@blueprint.route('/predict', methods=['POST'])
+@limit('light')
 def predict():
     """
     Standard prediction endpoint (backward compatible)
     """
+    s = state()
     try:
-        if model is None:
+        if s.model is None:
             return jsonify({
                 "error": "Model not loaded"
             }), 500
@@ -384,11 +500,14 @@ def predict():
                 "error": "No data provided"
             }), 400
 
+        patient_id, features = split_patient_id(data)
+
         # Convert to DataFrame
-        df = pd.DataFrame([data])
+        df = encode_features(features)
 
         # Predict
-        proba = model.predict_proba(df)[:, 1][0]
+        proba, ensemble_info = s.predict_positive_proba(df)
+        proba = proba[0]
         prediction = int(proba > 0.5)
         
         # Risk level
@@ -402,7 +521,9 @@ def predict():
             risk = "High Risk"
             risk_color = "red"
 
-        return jsonify({
+        record_prediction(patient_id, 'predict', proba, prediction, risk, features)
+
+        response = {
             "success": True,
             "prediction": prediction,
             "probability": float(proba),
@@ -410,42 +531,256 @@ def predict():
             "risk_level": risk,
             "risk_color": risk_color,
             "diagnosis": "Alzheimer's Disease" if prediction == 1 else "Healthy"
-        })
+        }
+        if ensemble_info is not None:
+            response["ensemble"] = ensemble_info
+        return jsonify(response)
 
+    except ScalingError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except EnsembleTimeoutError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 503
     except Exception as e:
         return jsonify({
             "success": False,
             "error": str(e)
         }), 500
 
-@app.route('/model-info', methods=['GET'])
+@blueprint.route('/predict-batch', methods=['POST'])
+@limit('batch')
+def predict_batch():
+    """
+    Score many patients in one request. The body is JSON by default or a binary columnar
+    batch (see wire_format.py) chosen by Content-Type; the response format follows Accept.
+    Returns the columns probability (float64) and prediction (int8), one value per row.
+    Rows with a PatientID are added to the patient history. The binary formats are only offered
+    here: single-patient endpoints exchange one small JSON object.
+    """
+    s = state()
+    response_type = request.accept_mimetypes.best_match(supported_media_types(), default=MEDIA_JSON)
+    try:
+        if s.model is None:
+            return jsonify({"success": False, "error": "Model not loaded"}), 500
+
+        try:
+            df = decode_batch(request.get_data(cache=False), request.content_type)
+        except WireFormatError as e:
+            return jsonify({"success": False, "error": str(e)}), 400 if request.mimetype in supported_media_types() else 415
+        if len(df) == 0:
+            return jsonify({"success": False, "error": "No rows provided"}), 400
+        if len(df) > s.max_batch_rows:
+            return jsonify({"success": False, "error": f"Batch exceeds {s.max_batch_rows} rows"}), 413
+
+        features = df.drop(columns=['PatientID'], errors='ignore')
+        proba, _ = s.predict_positive_proba(features)
+        proba = np.asarray(proba, dtype=np.float64)
+        prediction = (proba > 0.5).astype(np.int8)
+        if s.drift_monitor is not None:
+            s.drift_monitor.record_batch(features)
+        # One history row per patient with a PatientID, expanded and written by the history writer
+        if s.history is not None and 'PatientID' in df.columns:
+            s.history.record_batch(df['PatientID'].to_numpy(), 'predict-batch', s.model_version,
+                                   proba, prediction, features)
+
+        body = encode_batch({"probability": proba, "prediction": prediction}, response_type)
+        return current_app.response_class(body, mimetype=response_type)
+
+    except ScalingError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except EnsembleTimeoutError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@blueprint.route('/what-if', methods=['POST'])
+def what_if():
+    """
+    Risk curve (one feature) or surface (two features) for one patient as features vary.
+    Each sweep gives 'values', 'min'/'max'/'steps' or 'deltas' from the patient's value:
+    {
+        "patient": {"PatientID": "4751", "age": 75, "mmse": 24, "FunctionalAssessment": 6},
+        "vary": [
+            {"feature": "mmse", "deltas": [-3, -2, -1, 0]},
+            {"feature": "FunctionalAssessment", "min": 0, "max": 10, "steps": 11}
+        ]
+    }
+    """
+    s = state()
+    try:
+        if s.model is None:
+            return jsonify({"success": False, "error": "Model not loaded"}), 500
+
+        data = request.json
+        if not data or not isinstance(data.get('patient'), dict) or 'vary' not in data:
+            return jsonify({"success": False, "error": "Expected 'patient' and 'vary'"}), 400
+
+        patient_id, features = split_patient_id(data['patient'])
+        try:
+            sweeps = parse_sweeps(data['vary'], features, get_feature_names(s.model), s.what_if_max_points)
+        except (ValueError, TypeError) as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        key = make_key('what-if', data, s.model_version)
+        result = s.what_if_cache.get(key)
+        cached = result is not None
+        if not cached:
+            result = admitted_once(s, key, 'batch', lambda: compute_what_if(patient_id, features, sweeps))
+            s.what_if_cache.put(key, result)
+        return jsonify(dict(result, cached=cached))
+
+    except AdmissionRejected as e:
+        return rejection_response(e)
+    except ScalingError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except EnsembleTimeoutError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+def compute_what_if(patient_id, features, sweeps):
+    """Score the patient and the whole perturbation grid with one batched predict_proba"""
+    s = state()
+    grid = build_grid(features, sweeps)
+    # Score the columns in the order the model was fitted on when it says so
+    names = get_feature_names(s.model)
+    if names and set(names) <= set(grid.columns):
+        grid = grid[names]
+    proba, _ = s.predict_positive_proba(grid)
+    proba = np.asarray(proba, dtype=np.float64)
+    thresholds = [lower for _, lower in RECOMMENDATION_BANDS[1:]] + [None]
+    return {
+        "success": True,
+        "patient_id": patient_id,
+        "model_version": s.model_version,
+        "baseline_probability": float(proba[0]),
+        "grid_points": len(proba) - 1,
+        "risk_bands": [
+            {"category": category, "min": lower or 0.0, "max": upper if upper is not None else 1.0}
+            for (category, lower), upper in zip(RECOMMENDATION_BANDS, thresholds)
+        ],
+        "sweep": sweep_result(sweeps, proba[1:], RECOMMENDATION_BANDS)
+    }
+
+@blueprint.route('/patients/<patient_id>/history', methods=['GET'])
+@limit('light')
+def patient_history(patient_id):
+    """
+    Stored predictions for one patient, oldest first, with trend series.
+    Optional query parameters: start, end (epoch seconds or ISO 8601), limit (most recent N)
+    """
+    s = state()
+    if s.history is None:
+        # Disabled by configuration (empty HISTORY_DB_PATH), not a server fault
+        return jsonify({"success": False, "error": "Prediction history is disabled"}), 503
+
+    try:
+        start = parse_timestamp(request.args.get('start'))
+        end = parse_timestamp(request.args.get('end'))
+        limit = request.args.get('limit', type=int)
+    except ValueError as e:
+        return jsonify({"success": False, "error": f"Invalid query parameter: {e}"}), 400
+
+    try:
+        entries = s.history.history(patient_id, start=start, end=end, limit=limit)
+        return jsonify({
+            "success": True,
+            "patient_id": patient_id,
+            "count": len(entries),
+            "history": entries,
+            "trend": trend_summary(entries)
+        })
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@blueprint.route('/drift', methods=['GET'])
+def drift():
+    """
+    Input drift of live requests against the reference cohort (PSI and binned KS per feature).
+    ?refresh=1 recomputes now; ?histograms=1 adds bin edges and reference/live counts.
+    """
+    s = state()
+    if s.drift_monitor is None:
+        return jsonify({"error": "Dataset not loaded"}), 500
+
+    report = dict(s.drift_monitor.snapshot(force=request.args.get('refresh') == '1'))
+    if request.args.get('histograms') == '1':
+        report["histograms"] = s.drift_monitor.reference_histograms()
+    return jsonify({"success": True, "data": report})
+
+@blueprint.route('/model-info', methods=['GET'])
 def model_info():
     """Get information about the model"""
-    if model is None:
+    s = state()
+    if s.model is None:
         return jsonify({"error": "Model not loaded"}), 500
     
     try:
-        return jsonify({
-            "model_type": str(type(model).__name__),
-            "features": list(model.feature_names_) if hasattr(model, 'feature_names_') else "Not available",
-            "n_features": model.n_features_ if hasattr(model, 'n_features_') else "Not available"
-        })
+        info = {
+            "model_type": str(type(s.model).__name__),
+            "features": list(s.model.feature_names_) if hasattr(s.model, 'feature_names_') else "Not available",
+            "n_features": s.model.n_features_ if hasattr(s.model, 'n_features_') else "Not available",
+            "model_version": s.model_version
+        }
+        if isinstance(s.model, EnsembleModel):
+            info["ensemble_members"] = [
+                {"name": name, "model_type": type(m).__name__, "weight": weight}
+                for name, m, weight in s.model.members
+            ]
+        if s.scaler is not None:
+            info["scaled_features"] = s.scaler.feature_names or len(s.scaler.scale)
+        return jsonify(info)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@blueprint.route('/metrics', methods=['GET'])
+def metrics():
+    """Serving metrics: admission queues, coalescing, history, input drift and, for ensembles, per-model latency"""
+    s = state()
+    result = {
+        "model_version": s.model_version,
+        "coalescing": s.coalescer.metrics(),
+        "admission": s.admission.metrics(),
+        "cohort_scores": s.cohort_scorer.status(),
+        "history": s.history.metrics() if s.history is not None else None,
+        "what_if_cache": s.what_if_cache.metrics()
+    }
+    if s.drift_monitor is not None:
+        report = s.drift_monitor.snapshot()
+        result["drift"] = {
+            "status": report["status"],
+            "max_psi": report["max_psi"],
+            "requests_seen": report["requests_seen"],
+            "psi": {k: v.get("psi") for k, v in report["features"].items()}
+        }
+    if isinstance(s.model, EnsembleModel):
+        result["ensemble"] = s.model.metrics()
+    return jsonify(result)
+
 if __name__ == '__main__':
+    from app_factory import create_app
+
+    app = create_app(API_BLUEPRINTS='enhanced')
+    shared = app.extensions['model_resources']
     print("=" * 60)
     print("🚀 Starting Enhanced Alzheimer's Prediction API...")
     print("=" * 60)
-    print(f"📍 Model path: {MODEL_PATH}")
-    print(f"📊 Dataset path: {DATASET_PATH}")
+    print(f"📍 Model path: {shared.source}")
+    print(f"📊 Dataset path: {shared.dataset_path}")
     print(f"🌐 API will run on http://localhost:5001")
     print(f"\n📝 Endpoints:")
     print(f"   - GET  /health              - Health check")
     print(f"   - GET  /dataset-info        - Dataset statistics")
     print(f"   - POST /predict             - Standard prediction")
     print(f"   - POST /predict-enhanced    - Enhanced prediction with dataset analysis")
+    print(f"   - POST /predict-batch       - Batch prediction (JSON or binary columns)")
+    print(f"   - POST /what-if             - Risk sensitivity sweep for one patient")
+    print(f"   - GET  /patients/<id>/history - Stored prediction history")
+    print(f"   - GET  /drift               - Input drift against the dataset")
     print(f"   - GET  /model-info          - Model information")
+    print(f"   - GET  /metrics             - Serving metrics")
     print("=" * 60)
     
     # Run on port 5001
@@ -0,0 +1,201 @@
+"""
+Weighted multi-model ensemble for serving (XGBoost, RandomForest, CatBoost, ...).
+Members are scored concurrently - their native predictors release the GIL - and their
+positive-class probabilities are combined with configured weights. A per-request deadline
+drops members that have not finished in time; the result is then marked as degraded.
+Each member has its own small thread pool: a running predictor cannot be interrupted, so a
+member whose workers are all still busy past an earlier deadline is not called again (it
+is reported as timed out straight away) and can never hold up the other members.
+
+Config file (pointed to by ENSEMBLE_CONFIG):
+{
+    "members": [
+        {"name": "xgboost", "path": "test_models/xgb_model.pkl", "weight": 0.4},
+        {"name": "random_forest", "path": "test_models/rf_model.pkl", "weight": 0.3},
+        {"name": "catboost", "path": "test_models/catboost_alzheimers_model.pkl", "weight": 0.3}
+    ],
+    "timeout_ms": 250,
+    "member_workers": 2
+}
+Relative paths are resolved against the config file's directory.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import joblib
+import numpy as np
+
+
+class EnsembleTimeoutError(Exception):
+    """Raised when no ensemble member finished within the request budget"""
+
+
+class MemberStats:
+    """Rolling latency and outcome counters for one ensemble member"""
+
+    def __init__(self, window=1000):
+        self.lock = threading.Lock()
+        self.latencies_ms = deque(maxlen=window)
+        self.calls = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def record(self, latency_ms=None, timed_out=False, error=False):
+        with self.lock:
+            self.calls += 1
+            if timed_out:
+                self.timeouts += 1
+            elif error:
+                self.errors += 1
+            else:
+                self.completed += 1
+                self.latencies_ms.append(latency_ms)
+
+    def snapshot(self):
+        with self.lock:
+            latencies = np.array(self.latencies_ms) if self.latencies_ms else None
+            return {
+                "calls": self.calls,
+                "completed": self.completed,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "latency_ms": {
+                    "mean": float(latencies.mean()),
+                    "p50": float(np.percentile(latencies, 50)),
+                    "p95": float(np.percentile(latencies, 95)),
+                    "max": float(latencies.max()),
+                } if latencies is not None else None,
+            }
+
+
+class EnsembleModel:
+    """Combines predict_proba of several models, scored in parallel under a deadline"""
+
+    def __init__(self, members, timeout_ms=None, member_workers=2):
+        # members: list of (name, model, weight)
+        if not members:
+            raise ValueError("Ensemble needs at least one member")
+        self.members = [(name, m, float(weight)) for name, m, weight in members]
+        self.timeout_ms = timeout_ms
+        self.member_workers = member_workers
+        # One bounded pool per member, so a slow member only ever occupies its own workers
+        self.executors = {
+            name: ThreadPoolExecutor(max_workers=member_workers, thread_name_prefix=f'ensemble-{name}')
+            for name, _, _ in self.members
+        }
+        self.in_flight = {name: 0 for name, _, _ in self.members}
+        self.in_flight_lock = threading.Lock()
+        self.stats = {name: MemberStats() for name, _, _ in self.members}
+        self.paths = []
+
+        first = self.members[0][1]
+        if hasattr(first, 'feature_names_'):
+            self.feature_names_ = first.feature_names_
+            self.n_features_ = len(first.feature_names_)
+
+    @classmethod
+    def from_config(cls, config_path):
+        """Load every member listed in an ensemble JSON config"""
+        with open(config_path) as f:
+            config = json.load(f)
+        base_dir = os.path.dirname(os.path.abspath(config_path))
+        members = []
+        paths = []
+        for entry in config["members"]:
+            path = entry["path"]
+            if not os.path.isabs(path):
+                path = os.path.join(base_dir, path)
+            paths.append(path)
+            members.append((entry.get("name", os.path.basename(path)), joblib.load(path), entry.get("weight", 1.0)))
+        timeout_ms = os.environ.get('ENSEMBLE_TIMEOUT_MS', config.get("timeout_ms"))
+        ensemble = cls(members,
+                       timeout_ms=float(timeout_ms) if timeout_ms is not None else None,
+                       member_workers=int(config.get("member_workers", 2)))
+        ensemble.paths = paths
+        return ensemble
+
+    def _score(self, model, X):
+        start = time.perf_counter()
+        proba = np.asarray(model.predict_proba(X))[:, 1]
+        return proba, (time.perf_counter() - start) * 1000
+
+    def _submit(self, name, model, X, queue=False):
+        """Start scoring on the member's own pool; None when its workers are all busy (unless queue)"""
+        with self.in_flight_lock:
+            if not queue and self.in_flight[name] >= self.member_workers:
+                return None
+            self.in_flight[name] += 1
+        future = self.executors[name].submit(self._score, model, X)
+        future.add_done_callback(lambda _: self._finished(name))
+        return future
+
+    def _finished(self, name):
+        with self.in_flight_lock:
+            self.in_flight[name] -= 1
+
+    def predict_proba_with_info(self, X, timeout_ms=None):
+        """
+        Weighted positive-class probability over the members that finished in time.
+        timeout_ms=None uses the configured budget; timeout_ms=0 waits for every member.
+        Returns (proba as an (n, 2) array, info dict with per-member status and the degraded flag).
+        """
+        timeout_ms = self.timeout_ms if timeout_ms is None else timeout_ms
+        futures = {}
+        member_info = {}
+        for name, m, weight in self.members:
+            future = self._submit(name, m, X, queue=not timeout_ms)
+            if future is None:
+                # Every worker of this member is still running an overdue call
+                self.stats[name].record(timed_out=True)
+                member_info[name] = {"status": "timeout", "weight": weight, "skipped": True}
+                continue
+            futures[future] = (name, weight)
+        done, not_done = wait(futures, timeout=timeout_ms / 1000 if timeout_ms else None)
+
+        total = None
+        total_weight = 0.0
+        for future, (name, weight) in futures.items():
+            if future in not_done:
+                # Cannot interrupt a native predictor; drop its result when it eventually lands
+                future.cancel()
+                self.stats[name].record(timed_out=True)
+                member_info[name] = {"status": "timeout", "weight": weight}
+                continue
+            try:
+                proba, latency_ms = future.result()
+            except Exception as e:
+                self.stats[name].record(error=True)
+                member_info[name] = {"status": "error", "weight": weight, "error": str(e)}
+                continue
+            self.stats[name].record(latency_ms=latency_ms)
+            member_info[name] = {"status": "ok", "weight": weight, "latency_ms": latency_ms}
+            total = proba * weight if total is None else total + proba * weight
+            total_weight += weight
+
+        if total is None or total_weight == 0:
+            raise EnsembleTimeoutError("No ensemble member finished within the latency budget")
+
+        positive = total / total_weight
+        info = {
+            "degraded": any(v["status"] != "ok" for v in member_info.values()),
+            "members": member_info,
+            "timeout_ms": timeout_ms,
+        }
+        return np.column_stack([1 - positive, positive]), info
+
+    def predict_proba(self, X):
+        """Same contract as a single model, so existing callers keep working"""
+        return self.predict_proba_with_info(X)[0]
+
+    def metrics(self):
+        return {
+            "members": {name: dict(self.stats[name].snapshot(), in_flight=self.in_flight[name])
+                        for name, _, _ in self.members},
+            "weights": {name: weight for name, _, weight in self.members},
+            "timeout_ms": self.timeout_ms,
+        }
@@ -0,0 +1,50 @@
+"""
+Helpers for turning request payloads and cohort rows into model feature matrices.
+The API accepts lower-case keys (age, mmse, ...) while the reference dataset uses
+the Kaggle column names (Age, MMSE, ...), so both are aligned to the model here.
+"""
+import numpy as np
+import pandas as pd
+
+# Request keys that map onto a differently named column in the reference dataset
+FEATURE_ALIASES = {
+    'age': 'Age',
+    'gender': 'Gender',
+    'education': 'EducationLevel',
+    'mmse': 'MMSE',
+}
+
+
+def get_feature_names(model):
+    """Return the feature names a model was trained on, or None if it does not say"""
+    for attr in ('feature_names_', 'feature_names_in_'):
+        names = getattr(model, attr, None)
+        if names is not None:
+            return [str(n) for n in names]
+    return None
+
+
+def resolve_column(feature, columns):
+    """Find the dataset column that holds a model feature (exact, alias, then case-insensitive)"""
+    if feature in columns:
+        return feature
+    alias = FEATURE_ALIASES.get(feature)
+    if alias in columns:
+        return alias
+    lowered = {str(c).lower(): c for c in columns}
+    return lowered.get(str(feature).lower())
+
+
+def cohort_feature_frame(model, dataset):
+    """Build a float64 frame of the cohort aligned to the model's features (missing features are 0)"""
+    names = get_feature_names(model)
+    if names is None:
+        # No declared features: score the numeric columns as they are
+        return dataset.select_dtypes(include=[np.number]).drop(columns=['Diagnosis'], errors='ignore')
+
+    matrix = np.zeros((len(dataset), len(names)), dtype=np.float64)
+    for i, feature in enumerate(names):
+        column = resolve_column(feature, dataset.columns)
+        if column is not None:
+            matrix[:, i] = pd.to_numeric(dataset[column], errors='coerce').fillna(0).to_numpy()
+    return pd.DataFrame(matrix, columns=names)
@@ -0,0 +1,116 @@
+"""
+Fused feature scaling for inference.
+A chain of fitted scikit-learn scalers (StandardScaler, MinMaxScaler, MaxAbsScaler,
+RobustScaler) is an affine map per feature, so the whole chain collapses into one
+precomputed scale and offset array: x * scale + offset. Serving applies that in place
+on the encoded float batch, without loading or calling the transformer stack per request.
+Request keys are matched to the scalers' feature names by name, alias or case
+(feature_encoding.resolve_column); a batch that does not carry every scaled feature is
+rejected with ScalingError rather than scored unscaled.
+"""
+import numpy as np
+import pandas as pd
+
+from feature_encoding import resolve_column
+
+
+class ScalingError(ValueError):
+    """The batch does not match the features the scalers were fitted on"""
+
+
+def scaler_affine(scaler):
+    """(scale, offset) arrays equivalent to one fitted scaler's transform()"""
+    name = type(scaler).__name__
+    n = scaler.n_features_in_
+    if name == 'StandardScaler':
+        scale = 1 / scaler.scale_ if scaler.scale_ is not None else np.ones(n)
+        mean = scaler.mean_ if scaler.mean_ is not None and scaler.with_mean else np.zeros(n)
+        return scale, -mean * scale
+    if name == 'MinMaxScaler':
+        return np.asarray(scaler.scale_, dtype=np.float64), np.asarray(scaler.min_, dtype=np.float64)
+    if name == 'MaxAbsScaler':
+        return 1 / scaler.scale_, np.zeros(n)
+    if name == 'RobustScaler':
+        scale = 1 / scaler.scale_ if scaler.scale_ is not None else np.ones(n)
+        center = scaler.center_ if scaler.center_ is not None else np.zeros(n)
+        return scale, -center * scale
+    raise TypeError(f"Cannot fuse {name}: only affine scalers are supported")
+
+
+class AffineTransform:
+    """Per-feature x * scale + offset, optionally clipped, equivalent to a chain of scalers"""
+
+    def __init__(self, scale, offset, feature_names=None, clip=None):
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.offset = np.asarray(offset, dtype=np.float64)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.clip = clip
+
+    @classmethod
+    def from_scalers(cls, scalers):
+        """Compose fitted scalers (applied in list order) into a single transform"""
+        if not scalers:
+            raise ValueError("No scalers to fuse")
+        scale = np.ones(scalers[0].n_features_in_)
+        offset = np.zeros(scalers[0].n_features_in_)
+        clip = None
+        feature_names = None
+        for i, scaler in enumerate(scalers):
+            if scaler.n_features_in_ != len(scale):
+                raise ValueError(f"{type(scaler).__name__} expects {scaler.n_features_in_} features, "
+                                 f"previous scalers produce {len(scale)}")
+            if feature_names is None and hasattr(scaler, 'feature_names_in_'):
+                feature_names = [str(n) for n in scaler.feature_names_in_]
+            a, b = scaler_affine(scaler)
+            # a * (scale * x + offset) + b
+            scale, offset = a * scale, a * offset + b
+            if getattr(scaler, 'clip', False):
+                if i != len(scalers) - 1:
+                    raise ValueError("A clipping MinMaxScaler can only be fused as the last scaler")
+                clip = scaler.feature_range
+        return cls(scale, offset, feature_names=feature_names, clip=clip)
+
+    def transform_inplace(self, X, columns=None):
+        """Scale a float64 (n, d) array in place; columns selects which features X holds"""
+        scale = self.scale if columns is None else self.scale[columns]
+        offset = self.offset if columns is None else self.offset[columns]
+        np.multiply(X, scale, out=X)
+        np.add(X, offset, out=X)
+        if self.clip is not None:
+            np.clip(X, self.clip[0], self.clip[1], out=X)
+        return X
+
+    def transform_frame(self, df):
+        """Scaled copy of the encoded batch (same columns and order): one float64 matrix, transformed in place"""
+        if self.feature_names is None:
+            # Unnamed scalers: the batch columns are the scaled features, in order
+            if df.shape[1] != len(self.scale):
+                raise ScalingError(f"Scalers expect {len(self.scale)} features, got {df.shape[1]}")
+            X = self._matrix(df)
+            return pd.DataFrame(self.transform_inplace(X), columns=df.columns, index=df.index, copy=False)
+
+        # Request column -> position of the scaler feature it holds
+        position = {name: i for i, name in enumerate(self.feature_names)}
+        mapped = {}
+        for column in df.columns:
+            name = resolve_column(column, self.feature_names)
+            if name is not None and position[name] not in mapped.values():
+                mapped[column] = position[name]
+        missing = [name for name, i in position.items() if i not in mapped.values()]
+        if missing:
+            raise ScalingError(f"Missing features required by the scalers: {missing}")
+
+        columns = list(mapped)
+        X = self._matrix(df[columns])
+        self.transform_inplace(X, [mapped[c] for c in columns])
+        scaled = pd.DataFrame(X, columns=columns, index=df.index, copy=False)
+        # Columns the scalers do not know about pass through unchanged
+        extra = [c for c in df.columns if c not in mapped]
+        return pd.concat([scaled, df[extra]], axis=1)[list(df.columns)] if extra else scaled[list(df.columns)]
+
+    @staticmethod
+    def _matrix(df):
+        try:
+            return df.to_numpy(dtype=np.float64, copy=True)
+        except (TypeError, ValueError) as e:
+            raise ScalingError(f"Scaled features must be numeric: {e}")
@@ -0,0 +1,165 @@
+from flask import Blueprint, current_app, request, jsonify
+import pandas as pd
+
+from admission_control import AdmissionController, configured_classes
+from fused_scaler import ScalingError
+from prediction_history import PredictionHistory
+
+# Original prediction API (/health, /predict, /model-info) with its response format unchanged.
+# app_factory.create_app mounts it next to the enhanced routes, scoring through the same
+# shared model; test_model_api.py and API/test_model_api.py serve it on its own.
+blueprint = Blueprint('legacy', __name__)
+
+class LegacyState:
+    """Model resources plus the admission limits, drift monitor and history /predict goes through"""
+
+    def __init__(self, shared, admission, history=None, drift_monitor=None):
+        self.resources = shared
+        self.admission = admission
+        self.history = history
+        self.drift_monitor = drift_monitor
+
+def configure(app, shared, config):
+    """Serve the routes of this app from the shared resources. Next to the enhanced routes
+    (configured first), /predict shares their admission limits, drift monitor and history store;
+    on its own it gets its own limits and history store (no drift: the cohort is not loaded)."""
+    enhanced = app.extensions.get('enhanced_api')
+    if enhanced is not None:
+        app.extensions['legacy_api'] = LegacyState(shared, enhanced.admission, enhanced.history,
+                                                   enhanced.drift_monitor)
+        return
+    history = None
+    if config['HISTORY_DB_PATH']:
+        try:
+            history = PredictionHistory(config['HISTORY_DB_PATH'])
+            print(f"✅ Prediction history store opened at {config['HISTORY_DB_PATH']}")
+        except Exception as e:
+            print(f"❌ Error opening prediction history store: {e}")
+    admission = AdmissionController(configured_classes(config), max_total=int(config['ADMISSION_MAX_CONCURRENT']))
+    app.extensions['legacy_api'] = LegacyState(shared, admission, history)
+
+def state():
+    """Serving state of the app handling the current request"""
+    return current_app.extensions['legacy_api']
+
+def resources():
+    """Model resources of the app handling the current request"""
+    return state().resources
+
+def record_prediction(patient_id, proba, prediction, risk_level, features):
+    """Feed the drift monitor and queue the prediction for the history store, as the enhanced /predict does"""
+    s = state()
+    if s.drift_monitor is not None:
+        s.drift_monitor.record(features)
+    if s.history is not None:
+        s.history.record(patient_id, 'legacy-predict', resources().model_version, proba, prediction,
+                         risk_level, features)
+
+@blueprint.route('/health', methods=['GET'])
+def health():
+    """Health check endpoint"""
+    return jsonify({
+        "status": "healthy",
+        "model_loaded": resources().model is not None
+    })
+
+@blueprint.route('/predict', methods=['POST'])
+def predict():
+    """Admitted under the 'light' endpoint class (429/503 with Retry-After when saturated)"""
+    return state().admission.call('light', score_request)
+
+def score_request():
+    """
+    Predict Alzheimer's risk based on input features
+    Expected JSON format:
+    {
+        "age": 75,
+        "gender": 1,
+        "education": 16,
+        "apoe4": 1,
+        "mmse": 24,
+        "cdr": 0.5,
+        ... (other features required by your model)
+    }
+    """
+    try:
+        if resources().model is None:
+            return jsonify({
+                "error": "Model not loaded",
+                "message": "Please check the model path"
+            }), 500
+
+        data = request.json  # Receive JSON from Node.js
+
+        if not data:
+            return jsonify({
+                "error": "No data provided",
+                "message": "Please provide input features"
+            }), 400
+
+        # The optional PatientID keys the history entry; it is not a model feature
+        patient_id = data.get('PatientID')
+        features = {k: v for k, v in data.items() if k != 'PatientID'}
+
+        # Convert to DataFrame
+        df = pd.DataFrame([features])
+
+        # Predict probability and class
+        proba = resources().predict_positive_proba(df)[0][0]
+        prediction = int(proba > 0.5)
+
+        # Assign risk level
+        if proba < 0.3:
+            risk = "Low Risk"
+            risk_color = "green"
+        elif proba < 0.7:
+            risk = "Moderate Risk"
+            risk_color = "orange"
+        else:
+            risk = "High Risk"
+            risk_color = "red"
+
+        record_prediction(patient_id, proba, prediction, risk, features)
+
+        return jsonify({
+            "success": True,
+            "prediction": prediction,
+            "probability": float(proba),
+            "probability_percentage": float(proba * 100),
+            "risk_level": risk,
+            "risk_color": risk_color,
+            "diagnosis": "Alzheimer's Disease" if prediction == 1 else "Healthy"
+        })
+
+    except ScalingError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "message": "Input does not match the model's scaled features"
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "message": "Error during prediction"
+        }), 500
+
+@blueprint.route('/model-info', methods=['GET'])
+def model_info():
+    """Get information about the model"""
+    model = resources().model
+    if model is None:
+        return jsonify({
+            "error": "Model not loaded"
+        }), 500
+
+    try:
+        return jsonify({
+            "model_type": str(type(model).__name__),
+            "features": list(model.feature_names_) if hasattr(model, 'feature_names_') else "Not available",
+            "n_features": model.n_features_ if hasattr(model, 'n_features_') else "Not available"
+        })
+    except Exception as e:
+        return jsonify({
+            "error": str(e)
+        }), 500
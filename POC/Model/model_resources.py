@@ -0,0 +1,182 @@
+"""
+Model, scaler and reference-cohort resources shared by every API variant.
+The model (or ensemble) and its fused scalers are loaded once per process and configuration;
+every blueprint mounted by app_factory.create_app scores through the same objects. The
+reference dataset is read, and pre-scored once, only when a route set that uses it asks for it.
+"""
+import hashlib
+import os
+import sys
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from cohort_scores import CohortScorer
+from ensemble import EnsembleModel
+from feature_encoding import cohort_feature_frame
+from fused_scaler import AffineTransform
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def discover_model_path(model_dir=MODEL_DIR):
+    """The bundled CatBoost model, else the first .pkl under test_models/ or the Model directory"""
+    candidate = os.path.join(model_dir, 'test_models', 'catboost_alzheimers_model.pkl')
+    if os.path.exists(candidate):
+        return candidate
+    for d in [os.path.join(model_dir, 'test_models'), model_dir]:
+        try:
+            if os.path.isdir(d):
+                for fname in sorted(os.listdir(d)):
+                    if fname.lower().endswith('.pkl'):
+                        return os.path.join(d, fname)
+        except OSError:
+            continue
+    return None
+
+
+def resolve_dataset_path(path):
+    """Dataset path as given, or relative to the Model directory when it does not exist from the cwd"""
+    if not os.path.isabs(path) and not os.path.exists(path):
+        candidate = os.path.join(MODEL_DIR, path)
+        if os.path.exists(candidate):
+            return candidate
+    return path
+
+
+def model_fingerprint(paths):
+    """Short version id for the loaded model files (name, size and mtime of each)"""
+    digest = hashlib.sha1()
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode('utf-8'))
+        except (OSError, TypeError):
+            digest.update(f"{path};".encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def split_model_bundle(loaded, scaler_paths=()):
+    """(model, fitted scalers) from an unpickled bare model or {'model': ..., 'scalers': [...]} bundle;
+    scalers loaded from scaler_paths come after the bundled ones"""
+    scalers = []
+    if isinstance(loaded, dict) and 'model' in loaded:
+        scalers = list(loaded.get('scalers') or [])
+        loaded = loaded['model']
+    scalers += [joblib.load(path) for path in scaler_paths]
+    return loaded, scalers
+
+
+class Resources:
+    """Loaded model and fused scaler, plus the reference dataset and its pre-scored cohort on demand"""
+
+    def __init__(self, model_path=None, ensemble_config=None, scaler_paths=(), dataset_path=None):
+        self.model_path = model_path or (None if ensemble_config else discover_model_path())
+        self.ensemble_config = ensemble_config
+        self.scaler_paths = [p.strip() for p in scaler_paths if p.strip()]
+        self.dataset_path = resolve_dataset_path(dataset_path) if dataset_path else None
+        self.model = None
+        self.model_version = None
+        self.scaler = None
+        self.dataset = None
+        self.cohort_scorer = None
+        self._cohort_lock = threading.Lock()
+
+        self._load_model()
+
+    def load_cohort(self):
+        """Read the reference dataset and start scoring it in the background (first call only)"""
+        with self._cohort_lock:
+            if self.cohort_scorer is not None:
+                return
+            self._load_dataset()
+            # The reference cohort is scored once, in the background; the model is loaded once per
+            # process, so requests never trigger a re-scoring (restart to serve a new model)
+            self.cohort_scorer = CohortScorer(self.dataset)
+            if self.model is not None and self.dataset is not None:
+                self.cohort_scorer.start(self.model_version, self.score_cohort_rows)
+
+    def _load_model(self):
+        try:
+            # Make sure the Model directory is importable so unpickling can find custom classes
+            if MODEL_DIR not in sys.path:
+                sys.path.insert(0, MODEL_DIR)
+            # Try import of local dummy_model (no-op if not present)
+            try:
+                import dummy_model  # noqa: F401
+            except Exception:
+                pass
+            if self.ensemble_config:
+                self.model = EnsembleModel.from_config(self.ensemble_config)
+                print(f"✅ Ensemble loaded successfully from {self.ensemble_config}: "
+                      f"{[name for name, _, _ in self.model.members]}")
+                self.model_version = model_fingerprint([self.ensemble_config] + self.model.paths + self.scaler_paths)
+            else:
+                self.model = joblib.load(self.model_path)
+                print(f"✅ Model loaded successfully from {self.model_path}")
+                self.model_version = model_fingerprint([self.model_path] + self.scaler_paths)
+        except Exception as e:
+            print(f"❌ Error loading model: {e}")
+            self.model = None
+            return
+
+        # Fitted scalers (from a {'model': ..., 'scalers': [...]} bundle or scaler_paths) are
+        # collapsed once into a single per-feature scale/offset applied to every scored batch
+        try:
+            self.model, scalers = split_model_bundle(self.model, self.scaler_paths)
+            if scalers:
+                self.scaler = AffineTransform.from_scalers(scalers)
+                print(f"✅ Fused {len(scalers)} scaler(s) into one affine transform "
+                      f"({[type(s).__name__ for s in scalers]})")
+        except Exception as e:
+            print(f"❌ Error loading scalers: {e}")
+            self.model = None
+
+    def _load_dataset(self):
+        if not self.dataset_path:
+            return
+        try:
+            self.dataset = pd.read_csv(self.dataset_path)
+            print(f"✅ Dataset loaded successfully: {self.dataset.shape[0]} rows, {self.dataset.shape[1]} columns")
+            print(f"📊 Dataset columns: {self.dataset.columns.tolist()}")
+        except Exception as e:
+            print(f"❌ Error loading dataset: {e}")
+            self.dataset = None
+
+    @property
+    def source(self):
+        """What was loaded, for startup banners"""
+        return self.ensemble_config or self.model_path
+
+    def predict_positive_proba(self, df):
+        """Positive-class probabilities, plus member details when serving an ensemble"""
+        if self.scaler is not None:
+            df = self.scaler.transform_frame(df)
+        if isinstance(self.model, EnsembleModel):
+            proba, info = self.model.predict_proba_with_info(df)
+            return proba[:, 1], info
+        return self.model.predict_proba(df)[:, 1], None
+
+    def score_cohort_rows(self, rows):
+        """Positive-class probabilities for reference cohort rows (no per-request ensemble deadline)"""
+        X = cohort_feature_frame(self.model, rows)
+        if self.scaler is not None:
+            X = self.scaler.transform_frame(X)
+        if isinstance(self.model, EnsembleModel):
+            return self.model.predict_proba_with_info(X, timeout_ms=0)[0][:, 1]
+        return np.asarray(self.model.predict_proba(X))[:, 1]
+
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def get_resources(model_path=None, ensemble_config=None, scaler_paths=(), dataset_path=None):
+    """Resources for this configuration, loaded on first use and shared afterwards"""
+    key = (model_path, ensemble_config, tuple(scaler_paths), dataset_path)
+    with _lock:
+        if key not in _loaded:
+            _loaded[key] = Resources(model_path, ensemble_config, scaler_paths, dataset_path)
+        return _loaded[key]
@@ -0,0 +1,232 @@
+"""
+Longitudinal prediction history, stored in an embedded SQLite database (WAL mode).
+Each prediction is queued from the request thread and written in batches by a background
+writer, so the request path never waits on disk. A scored batch is queued as one item and
+only expanded into per-patient rows (and JSON inputs) on the writer thread. Reads use an index on
+(patient_id, created_at), so a patient's history over a time range is a range scan
+and old assessments never need rescoring.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id TEXT,
+    created_at REAL NOT NULL,
+    endpoint TEXT NOT NULL,
+    model_version TEXT,
+    probability REAL NOT NULL,
+    prediction INTEGER NOT NULL,
+    risk_level TEXT,
+    input_json TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_patient_time ON predictions (patient_id, created_at);
+"""
+
+
+def parse_timestamp(value):
+    """Accept epoch seconds or an ISO 8601 string; None passes through"""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(value)).timestamp()
+
+
+class _BatchRecord:
+    """One scored batch waiting in the write queue"""
+
+    def __init__(self, patient_ids, created_at, endpoint, model_version, probabilities, predictions, inputs):
+        self.patient_ids = patient_ids
+        self.created_at = created_at
+        self.endpoint = endpoint
+        self.model_version = model_version
+        self.probabilities = probabilities
+        self.predictions = predictions
+        self.inputs = inputs
+
+    def rows(self):
+        # Batch responses carry no risk level, so none is stored
+        return [
+            (_patient_key(patient_id), self.created_at, self.endpoint, self.model_version, float(probability),
+             int(prediction), None, json.dumps(input_data, sort_keys=True, default=str))
+            for patient_id, probability, prediction, input_data in zip(
+                self.patient_ids, self.probabilities, self.predictions, self.inputs.to_dict('records'))
+        ]
+
+
+def _patient_key(patient_id):
+    """Stored id of a batch patient: numeric id columns hold floats (4751.0 -> '4751')"""
+    if isinstance(patient_id, float) and patient_id.is_integer():
+        return str(int(patient_id))
+    return str(patient_id)
+
+
+def _expand(item):
+    """History rows for one queued item (a single row or a _BatchRecord)"""
+    return item.rows() if isinstance(item, _BatchRecord) else [item]
+
+
+class PredictionHistory:
+    """Append-optimised prediction log with batched background writes"""
+
+    def __init__(self, path, batch_size=500, flush_interval=0.5, max_queue=10000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+        self.writer = threading.Thread(target=self._write_loop, daemon=True, name='history-writer')
+        self.writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def record(self, patient_id, endpoint, model_version, probability, prediction, risk_level, input_data):
+        """Queue one prediction for writing; never blocks the request.
+        Predictions without a patient_id cannot be looked up again, so they are not stored."""
+        if patient_id is None:
+            return
+        row = (
+            str(patient_id),
+            time.time(),
+            endpoint,
+            model_version,
+            float(probability),
+            int(prediction),
+            risk_level,
+            json.dumps(input_data, sort_keys=True, default=str),
+        )
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def record_batch(self, patient_ids, endpoint, model_version, probabilities, predictions, inputs):
+        """Queue a scored batch (inputs is the feature frame, one row per patient); rows whose
+        patient id is missing are skipped. Never blocks the request."""
+        keep = pd.notna(np.asarray(patient_ids, dtype=object))
+        if not keep.any():
+            return
+        item = _BatchRecord(np.asarray(patient_ids, dtype=object)[keep], time.time(), endpoint, model_version,
+                            np.asarray(probabilities)[keep], np.asarray(predictions)[keep], inputs[keep])
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += len(item.patient_ids)
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            items = [self.queue.get()]
+            rows = _expand(items[0])
+            deadline = time.monotonic() + self.flush_interval
+            while len(rows) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                rows += _expand(items[-1])
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO predictions (patient_id, created_at, endpoint, model_version, "
+                        "probability, prediction, risk_level, input_json) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                self.written += len(rows)
+                self.batches += 1
+            except sqlite3.Error as e:
+                self.dropped += len(rows)
+                print(f"❌ Error writing prediction history: {e}")
+            finally:
+                for _ in items:
+                    self.queue.task_done()
+
+    def flush(self):
+        """Block until every queued prediction has been written"""
+        self.queue.join()
+
+    def history(self, patient_id, start=None, end=None, limit=None):
+        """A patient's predictions in time order, optionally limited to [start, end]"""
+        sql = ("SELECT created_at, endpoint, model_version, probability, prediction, risk_level, input_json "
+               "FROM predictions WHERE patient_id = ?")
+        params = [str(patient_id)]
+        if start is not None:
+            sql += " AND created_at >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND created_at <= ?"
+            params.append(end)
+        sql += " ORDER BY created_at"
+        if limit is not None:
+            # Most recent `limit` entries, still returned oldest first
+            sql = f"SELECT * FROM ({sql} DESC LIMIT ?) ORDER BY created_at"
+            params.append(int(limit))
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        return [
+            {
+                "timestamp": datetime.fromtimestamp(created_at).isoformat(timespec='seconds'),
+                "created_at": created_at,
+                "endpoint": endpoint,
+                "model_version": model_version,
+                "probability": probability,
+                "prediction": prediction,
+                "risk_level": risk_level,
+                "input_data": json.loads(input_json) if input_json else None,
+            }
+            for created_at, endpoint, model_version, probability, prediction, risk_level, input_json in rows
+        ]
+
+    def metrics(self):
+        return {
+            "path": os.path.abspath(self.path),
+            "queued": self.queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+        }
+
+
+def trend_summary(entries):
+    """Series and simple slope of predicted risk (and MMSE when present) over time"""
+    times = [e["created_at"] for e in entries]
+    probabilities = [e["probability"] for e in entries]
+    summary = {
+        "timestamps": [e["timestamp"] for e in entries],
+        "probabilities": probabilities,
+        "mmse": [(e["input_data"] or {}).get("mmse") for e in entries],
+    }
+    if len(entries) >= 2:
+        span_years = (times[-1] - times[0]) / (365.25 * 24 * 3600)
+        summary["first_probability"] = probabilities[0]
+        summary["last_probability"] = probabilities[-1]
+        summary["change"] = probabilities[-1] - probabilities[0]
+        summary["change_per_year"] = summary["change"] / span_years if span_years > 0 else None
+    return summary
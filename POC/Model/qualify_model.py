@@ -0,0 +1,307 @@
+"""
+Qualify a pickled model before it is promoted to the model registry.
+Measures deserialize time and resident memory, first-call versus warm latency,
+throughput across batch sizes and agreement with a reference model on the
+cohort CSV, writes a JSON report and fails on configurable regressions.
+The model is scored as the API serves it: a {'model', 'scalers'} bundle is unwrapped and
+its fitted scalers (plus any --scalers files) are fused and applied before every call.
+Usage:
+  python qualify_model.py [path/to/model.pkl] [--scalers a.pkl,b.pkl] [--reference ref.pkl] [--output report.json]
+                          [--baseline old_report.json] [--max-regression 0.25]
+                          [--max-load-seconds S] [--max-rss-mb MB] [--max-warm-ms MS]
+                          [--min-throughput ROWS_PER_S] [--min-agreement FRACTION]
+If no path is provided, the same lookup as validate_model.py is used.
+Exits with code 0 when every check passes, 1 otherwise.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from feature_encoding import cohort_feature_frame, get_feature_names
+from fused_scaler import AffineTransform
+from model_resources import split_model_bundle
+from validate_model import find_model_path
+
+DEFAULT_BATCH_SIZES = [1, 10, 100, 1000, 10000, 100000]
+
+
+def default_dataset_path():
+    """Resolve the cohort CSV the same way the API does"""
+    path = os.environ.get('DATASET_PATH', 'alzheimers_disease_data.csv')
+    if not os.path.isabs(path) and not os.path.exists(path):
+        candidate = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+        if os.path.exists(candidate):
+            path = candidate
+    return path
+
+
+def _rss_mb():
+    """Resident memory of this process in MB (peak RSS when psutil is unavailable)"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KB on Linux and bytes on macOS
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        return None
+
+
+class ServedModel:
+    """A model scored the way the API scores it: fitted scalers fused and applied in front"""
+
+    def __init__(self, model, scalers=()):
+        self.model = model
+        self.scalers = [type(s).__name__ for s in scalers]
+        self.scaler = AffineTransform.from_scalers(scalers) if scalers else None
+        # So cohort_feature_frame aligns the cohort to the wrapped model's features
+        self.feature_names_ = get_feature_names(model)
+
+    def predict_proba(self, X):
+        if self.scaler is not None:
+            X = self.scaler.transform_frame(X)
+        return self.model.predict_proba(X)
+
+
+def measure_load(path, scaler_paths=()):
+    """Deserialize the model (and fuse its scalers), returning it ready to score with load time and memory growth"""
+    # Make sure custom model classes (e.g. DummyModel) can be unpickled
+    model_dir = os.path.dirname(os.path.abspath(__file__))
+    if model_dir not in sys.path:
+        sys.path.insert(0, model_dir)
+    try:
+        import dummy_model  # noqa: F401
+    except Exception:
+        pass
+
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    model = ServedModel(*split_model_bundle(joblib.load(path), scaler_paths))
+    load_seconds = time.perf_counter() - start
+    rss_after = _rss_mb()
+
+    rss_delta = None
+    if rss_before is not None and rss_after is not None:
+        rss_delta = max(rss_after - rss_before, 0.0)
+    return model, {
+        "file_size_mb": os.path.getsize(path) / (1024 * 1024),
+        "load_seconds": load_seconds,
+        "rss_delta_mb": rss_delta,
+    }
+
+
+def _batch(X, size):
+    """Tile cohort rows up to the requested batch size"""
+    return X.iloc[np.arange(size) % len(X)].reset_index(drop=True)
+
+
+def measure_latency(model, X, warm_runs=50):
+    """Time the first predict_proba call separately from warm single-row calls"""
+    row = _batch(X, 1)
+    start = time.perf_counter()
+    model.predict_proba(row)
+    first_call_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    for _ in range(warm_runs):
+        start = time.perf_counter()
+        model.predict_proba(row)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings = np.array(timings)
+    return {
+        "first_call_ms": first_call_ms,
+        "warm_mean_ms": float(timings.mean()),
+        "warm_p50_ms": float(np.percentile(timings, 50)),
+        "warm_p95_ms": float(np.percentile(timings, 95)),
+        "warm_runs": warm_runs,
+    }
+
+
+def measure_throughput(model, X, batch_sizes=DEFAULT_BATCH_SIZES, min_seconds=0.2, max_repeats=50):
+    """Rows scored per second for each batch size"""
+    results = []
+    for size in batch_sizes:
+        batch = _batch(X, size)
+        model.predict_proba(batch)  # warm-up at this size
+        repeats = 0
+        elapsed = 0.0
+        while repeats < max_repeats and (repeats == 0 or elapsed < min_seconds):
+            start = time.perf_counter()
+            model.predict_proba(batch)
+            elapsed += time.perf_counter() - start
+            repeats += 1
+        per_batch = elapsed / repeats
+        results.append({
+            "batch_size": size,
+            "repeats": repeats,
+            "seconds_per_batch": per_batch,
+            "rows_per_second": size / per_batch if per_batch > 0 else float('inf'),
+        })
+    return results
+
+
+def measure_agreement(model, reference, dataset, threshold=0.5):
+    """Compare positive-class probabilities of two models over the whole cohort"""
+    proba = np.asarray(model.predict_proba(cohort_feature_frame(model, dataset)))[:, 1]
+    ref_proba = np.asarray(reference.predict_proba(cohort_feature_frame(reference, dataset)))[:, 1]
+    diff = np.abs(proba - ref_proba)
+    return {
+        "rows": int(len(dataset)),
+        "max_abs_diff": float(diff.max()) if len(diff) else 0.0,
+        "mean_abs_diff": float(diff.mean()) if len(diff) else 0.0,
+        "label_agreement": float(((proba > threshold) == (ref_proba > threshold)).mean()) if len(diff) else 1.0,
+    }
+
+
+def check_limits(report, limits):
+    """Absolute limits from the command line; returns a list of failure messages"""
+    failures = []
+    load = report["load"]
+    latency = report["latency"]
+    if limits.get("max_load_seconds") is not None and load["load_seconds"] > limits["max_load_seconds"]:
+        failures.append(f"load_seconds {load['load_seconds']:.3f} > {limits['max_load_seconds']}")
+    if limits.get("max_rss_mb") is not None and load["rss_delta_mb"] is not None \
+            and load["rss_delta_mb"] > limits["max_rss_mb"]:
+        failures.append(f"rss_delta_mb {load['rss_delta_mb']:.1f} > {limits['max_rss_mb']}")
+    if limits.get("max_warm_ms") is not None and latency["warm_p50_ms"] > limits["max_warm_ms"]:
+        failures.append(f"warm_p50_ms {latency['warm_p50_ms']:.3f} > {limits['max_warm_ms']}")
+    if limits.get("min_throughput") is not None and report["throughput"]:
+        largest = report["throughput"][-1]
+        if largest["rows_per_second"] < limits["min_throughput"]:
+            failures.append(
+                f"rows_per_second at batch {largest['batch_size']} "
+                f"{largest['rows_per_second']:.0f} < {limits['min_throughput']}"
+            )
+    if limits.get("min_agreement") is not None:
+        agreement = report.get("agreement")
+        if agreement is None:
+            failures.append("min_agreement requested but no reference model was given")
+        elif agreement["label_agreement"] < limits["min_agreement"]:
+            failures.append(f"label_agreement {agreement['label_agreement']:.4f} < {limits['min_agreement']}")
+    return failures
+
+
+def check_baseline(report, baseline, max_regression):
+    """Relative regressions against a previous qualification report"""
+    failures = []
+
+    def worse(name, new, old, higher_is_worse=True):
+        if new is None or old is None or old == 0:
+            return
+        change = (new - old) / old if higher_is_worse else (old - new) / old
+        if change > max_regression:
+            failures.append(f"{name} regressed {change * 100:.1f}% (baseline {old:.4g}, now {new:.4g})")
+
+    worse("load_seconds", report["load"]["load_seconds"], baseline["load"].get("load_seconds"))
+    worse("rss_delta_mb", report["load"]["rss_delta_mb"], baseline["load"].get("rss_delta_mb"))
+    worse("warm_p50_ms", report["latency"]["warm_p50_ms"], baseline["latency"].get("warm_p50_ms"))
+    old_throughput = {t["batch_size"]: t["rows_per_second"] for t in baseline.get("throughput", [])}
+    for t in report["throughput"]:
+        worse(f"rows_per_second[{t['batch_size']}]", t["rows_per_second"],
+              old_throughput.get(t["batch_size"]), higher_is_worse=False)
+    return failures
+
+
+def qualify(path, dataset_path, reference_path=None, batch_sizes=DEFAULT_BATCH_SIZES, warm_runs=50,
+            scaler_paths=()):
+    """Run every measurement and return the report dict (without pass/fail)"""
+    model, load = measure_load(path, scaler_paths)
+    dataset = pd.read_csv(dataset_path)
+    X = cohort_feature_frame(model, dataset)
+
+    report = {
+        "model_path": os.path.abspath(path),
+        "model_type": type(model.model).__name__,
+        "scalers": model.scalers,
+        "feature_names": get_feature_names(model),
+        "dataset_path": os.path.abspath(dataset_path),
+        "dataset_rows": int(len(dataset)),
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "load": load,
+        "latency": measure_latency(model, X, warm_runs=warm_runs),
+        "throughput": measure_throughput(model, X, batch_sizes=batch_sizes),
+        "agreement": None,
+    }
+    if reference_path:
+        reference, _ = measure_load(reference_path)
+        report["agreement"] = measure_agreement(model, reference, dataset)
+        report["reference_path"] = os.path.abspath(reference_path)
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Qualify a model artifact for serving")
+    parser.add_argument("model", nargs="?", help="Path to the model .pkl")
+    parser.add_argument("--dataset", default=None, help="Cohort CSV (defaults to $DATASET_PATH)")
+    parser.add_argument("--scalers", default=os.environ.get('SCALER_PATHS', ''),
+                        help="Comma separated fitted scaler .pkl files applied before the model "
+                             "(defaults to $SCALER_PATHS)")
+    parser.add_argument("--reference", default=None, help="Reference model .pkl to compare predictions against")
+    parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout")
+    parser.add_argument("--batch-sizes", default=",".join(str(b) for b in DEFAULT_BATCH_SIZES),
+                        help="Comma separated batch sizes for the throughput profile")
+    parser.add_argument("--warm-runs", type=int, default=50)
+    parser.add_argument("--baseline", default=None, help="Previous report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Allowed relative regression versus --baseline (0.25 = 25%%)")
+    parser.add_argument("--max-load-seconds", type=float, default=None)
+    parser.add_argument("--max-rss-mb", type=float, default=None)
+    parser.add_argument("--max-warm-ms", type=float, default=None)
+    parser.add_argument("--min-throughput", type=float, default=None,
+                        help="Minimum rows/s at the largest batch size")
+    parser.add_argument("--min-agreement", type=float, default=None,
+                        help="Minimum label agreement with --reference")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    path = find_model_path(args.model)
+    if not path or not os.path.exists(path):
+        print('Model file not found', file=sys.stderr)
+        return 1
+
+    batch_sizes = [int(b) for b in args.batch_sizes.split(',') if b.strip()]
+    scaler_paths = [p.strip() for p in args.scalers.split(',') if p.strip()]
+    report = qualify(path, args.dataset or default_dataset_path(), args.reference,
+                     batch_sizes=batch_sizes, warm_runs=args.warm_runs, scaler_paths=scaler_paths)
+
+    failures = check_limits(report, {
+        "max_load_seconds": args.max_load_seconds,
+        "max_rss_mb": args.max_rss_mb,
+        "max_warm_ms": args.max_warm_ms,
+        "min_throughput": args.min_throughput,
+        "min_agreement": args.min_agreement,
+    })
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures.extend(check_baseline(report, json.load(f), args.max_regression))
+    report["failures"] = failures
+    report["passed"] = not failures
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+        print(f'Report written to: {args.output}', file=sys.stderr)
+    else:
+        print(text)
+
+    for failure in failures:
+        print('❌', failure, file=sys.stderr)
+    print('\nQUALIFICATION RESULT: ', 'OK' if not failures else 'FAILED', file=sys.stderr)
+    return 0 if not failures else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
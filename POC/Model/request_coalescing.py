@@ -0,0 +1,70 @@
+"""
+Single-flight coalescing of identical in-flight requests.
+When the dashboard and the Node backend ask for the same patient's prediction at the
+same moment, only the first request computes it; the others wait and share its result.
+Requests that are not exact duplicates are never delayed.
+"""
+import json
+import threading
+
+
+def make_key(endpoint, payload, model_version):
+    """Canonical key for a request: endpoint, model version and the payload with sorted keys"""
+    body = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return f"{endpoint}|{model_version}|{body}"
+
+
+class _Call:
+    """One in-flight computation and the result it will publish"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs fn once per key at a time; concurrent callers with the same key share the result"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self.calls[key] = call
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            # Forget the key before waking waiters so later requests compute fresh results
+            with self.lock:
+                del self.calls[key]
+            call.event.set()
+
+    def metrics(self):
+        with self.lock:
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self.calls),
+            }
@@ -1,8 +1,10 @@
 """Run the enhanced API tests non-interactively.
 This imports the functions from test_enhanced_api.py and runs them sequentially.
+Pass --in-process to run them against app_factory.create_app() without starting a server.
 """
 import sys
 import os
+from urllib.parse import urlsplit
 
 # Ensure current directory is the Model directory so imports work
 here = os.path.dirname(__file__)
@@ -10,13 +12,48 @@ os.chdir(here)
 
 import test_enhanced_api as tests
 
+
+class InProcessResponse:
+    """The parts of a requests.Response the tests read"""
+
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.text = response.get_data(as_text=True)
+        self._response = response
+
+    def json(self):
+        return self._response.get_json()
+
+
+class InProcessClient:
+    """Stands in for the requests module, routing BASE_URL calls to a Flask test client"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def get(self, url, **kwargs):
+        return InProcessResponse(self.client.get(urlsplit(url).path, headers=kwargs.get('headers')))
+
+    def post(self, url, json=None, **kwargs):
+        return InProcessResponse(self.client.post(urlsplit(url).path, json=json, headers=kwargs.get('headers')))
+
+
+def use_in_process_app():
+    from app_factory import create_app
+    app = create_app(API_BLUEPRINTS='enhanced')
+    tests.requests = InProcessClient(app)
+
+
 def main():
+    if '--in-process' in sys.argv[1:]:
+        use_in_process_app()
     print('\nRunning enhanced API tests (non-interactive)')
     results = []
     results.append(("Health Check", tests.test_health()))
     results.append(("Dataset Info", tests.test_dataset_info()))
     results.append(("Enhanced Prediction", tests.test_enhanced_prediction()))
     results.append(("Standard Prediction", tests.test_standard_prediction()))
+    results.append(("Patient History", tests.test_patient_history()))
 
     print('\nTEST SUMMARY')
     passed = 0
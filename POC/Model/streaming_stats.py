@@ -0,0 +1,283 @@
+"""
+Single-pass, mergeable dataset statistics for files too large to hold in memory.
+A CSV is read in chunks and each chunk is summarised into a partial result per column:
+count, mean/M2 (Chan's parallel update), min, max, nulls, a relative-error quantile
+sketch (log buckets, as in DDSketch) and exact value counts up to a cardinality limit.
+Partials merge associatively, so chunks can be summarised on several processes and
+combined. Quantiles are exact while a column's value counts are complete and within the
+sketch's relative accuracy (1% by default) otherwise.
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNKSIZE = 100_000
+DEFAULT_MAX_DISTINCT = 1000
+DEFAULT_RELATIVE_ACCURACY = 0.01
+PERCENTILES = [0.25, 0.5, 0.75]
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with log-spaced buckets and bounded relative error"""
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+
+    def _add_buckets(self, store, values):
+        keys, counts = np.unique(np.ceil(np.log(values) / self.log_gamma).astype(np.int64), return_counts=True)
+        for k, c in zip(keys.tolist(), counts.tolist()):
+            store[k] = store.get(k, 0) + c
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return
+        self._add_buckets(self.positive, values[values > 0])
+        self._add_buckets(self.negative, -values[values < 0])
+        self.zeros += int((values == 0).sum())
+        self.count += len(values)
+
+    def merge(self, other):
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for k, c in other_store.items():
+                store[k] = store.get(k, 0) + c
+        self.zeros += other.zeros
+        self.count += other.count
+        return self
+
+    def _value(self, key):
+        # Bucket midpoint in relative terms: at most relative_accuracy away from any value in it
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for k in sorted(self.negative, reverse=True):
+            seen += self.negative[k]
+            if seen > rank:
+                return -self._value(k)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for k in sorted(self.positive):
+            seen += self.positive[k]
+            if seen > rank:
+                return self._value(k)
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+
+class ColumnStats:
+    """Partial statistics for one column over the rows seen so far"""
+
+    def __init__(self, max_distinct=DEFAULT_MAX_DISTINCT, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.max_distinct = max_distinct
+        self.kind = None  # 'int64', 'float64', 'bool' or 'object'
+        self.rows = 0
+        self.nulls = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.values = {}
+        self.values_truncated = False
+
+    @staticmethod
+    def _kind(series):
+        if pd.api.types.is_bool_dtype(series):
+            return 'bool'
+        if pd.api.types.is_integer_dtype(series):
+            return 'int64'
+        if pd.api.types.is_float_dtype(series):
+            return 'float64'
+        return 'object'
+
+    @staticmethod
+    def _widen(a, b):
+        order = ['bool', 'int64', 'float64', 'object']
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return order[max(order.index(a), order.index(b))]
+
+    def _merge_values(self, values, truncated):
+        if self.values_truncated or truncated:
+            self.values = {}
+            self.values_truncated = True
+            return
+        for v, c in values.items():
+            self.values[v] = self.values.get(v, 0) + c
+        if len(self.values) > self.max_distinct:
+            self.values = {}
+            self.values_truncated = True
+
+    def update(self, series):
+        self.rows += len(series)
+        nulls = int(series.isna().sum())
+        self.nulls += nulls
+        self.kind = self._widen(self.kind, self._kind(series))
+        present = series.dropna()
+
+        counts = present.value_counts(sort=False)
+        self._merge_values({(v.item() if hasattr(v, 'item') else v): int(c) for v, c in counts.items()},
+                           truncated=len(counts) > self.max_distinct)
+
+        if self.kind == 'object' or not len(present):
+            return
+        x = present.to_numpy(dtype=np.float64)
+        chunk = ColumnStats(self.max_distinct)
+        chunk.count = len(x)
+        chunk.mean = float(x.mean())
+        chunk.m2 = float(((x - chunk.mean) ** 2).sum())
+        chunk.min = float(x.min())
+        chunk.max = float(x.max())
+        self._merge_moments(chunk)
+        self.sketch.update(x)
+
+    def _merge_moments(self, other):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.kind = self._widen(self.kind, other.kind)
+        self._merge_moments(other)
+        self.sketch.merge(other.sketch)
+        self._merge_values(other.values, other.values_truncated)
+        return self
+
+    @property
+    def numeric(self):
+        return self.kind in ('bool', 'int64', 'float64') and self.count > 0
+
+    def quantile(self, q):
+        """Exact (linear interpolation, as pandas) while value counts are complete, else from the sketch"""
+        if not self.values_truncated and self.values:
+            items = sorted((float(v), c) for v, c in self.values.items())
+            position = q * (self.count - 1)
+            lo, hi = math.floor(position), math.ceil(position)
+            lo_value = hi_value = None
+            seen = 0
+            for value, c in items:
+                if lo_value is None and seen + c > lo:
+                    lo_value = value
+                if seen + c > hi:
+                    hi_value = value
+                    break
+                seen += c
+            return lo_value + (hi_value - lo_value) * (position - lo)
+        return self.sketch.quantile(q)
+
+    def describe(self):
+        """Same keys as DataFrame.describe() for a numeric column"""
+        std = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else float('nan')
+        result = {"count": float(self.count), "mean": self.mean, "std": std, "min": self.min}
+        for q in PERCENTILES:
+            result[f"{int(q * 100)}%"] = self.quantile(q)
+        result["max"] = self.max
+        return result
+
+
+class DatasetStats:
+    """Partial statistics for a whole table; merge() combines partials from other chunks"""
+
+    def __init__(self, max_distinct=DEFAULT_MAX_DISTINCT, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.max_distinct = max_distinct
+        self.relative_accuracy = relative_accuracy
+        self.rows = 0
+        self.columns = {}
+
+    def update(self, df):
+        self.rows += len(df)
+        for col in df.columns:
+            if col not in self.columns:
+                self.columns[col] = ColumnStats(self.max_distinct, self.relative_accuracy)
+            self.columns[col].update(df[col])
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        for col, stats in other.columns.items():
+            # Merged into a fresh ColumnStats rather than adopted, so `other` is never mutated later
+            if col not in self.columns:
+                self.columns[col] = ColumnStats(self.max_distinct, self.relative_accuracy)
+            self.columns[col].merge(stats)
+        return self
+
+    def summary(self, max_distribution_values=50):
+        """Totals, dtypes, missing values, describe()-style stats and small value distributions"""
+        columns = list(self.columns)
+        return {
+            "total_rows": self.rows,
+            "columns": columns,
+            "data_types": {c: self.columns[c].kind for c in columns},
+            "missing_values": {c: self.columns[c].nulls for c in columns},
+            "basic_stats": {c: self.columns[c].describe() for c in columns if self.columns[c].numeric},
+            "value_distributions": {
+                c: dict(sorted(self.columns[c].values.items(), key=lambda kv: -kv[1]))
+                for c in columns
+                if not self.columns[c].values_truncated and len(self.columns[c].values) <= max_distribution_values
+            },
+        }
+
+
+def _summarise_chunk(chunk, max_distinct, relative_accuracy):
+    return DatasetStats(max_distinct, relative_accuracy).update(chunk)
+
+
+def compute_stats(source, chunksize=DEFAULT_CHUNKSIZE, workers=1,
+                  max_distinct=DEFAULT_MAX_DISTINCT, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+    """
+    One pass over a CSV path (read in chunks) or an in-memory DataFrame.
+    workers > 1 summarises chunks on a process pool while the next chunks are read.
+    """
+    if isinstance(source, pd.DataFrame):
+        chunks = (source.iloc[i:i + chunksize] for i in range(0, len(source), chunksize))
+    else:
+        chunks = pd.read_csv(source, chunksize=chunksize, low_memory=False)
+
+    total = DatasetStats(max_distinct, relative_accuracy)
+    if workers <= 1:
+        for chunk in chunks:
+            total.update(chunk)
+        return total
+
+    # Keep only a few chunks in flight so memory stays bounded
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for chunk in chunks:
+            pending.append(pool.submit(_summarise_chunk, chunk, max_distinct, relative_accuracy))
+            if len(pending) >= 2 * workers:
+                total.merge(pending.pop(0).result())
+        for future in pending:
+            total.merge(future.result())
+    return total
+
+
+def default_workers():
+    return max(1, min(4, (os.cpu_count() or 1) - 1))
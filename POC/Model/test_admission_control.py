@@ -0,0 +1,80 @@
+"""
+Tests for admission_control: priority ordering between endpoint classes and per-class limits.
+Run with pytest or directly: python test_admission_control.py
+"""
+import threading
+import time
+
+from admission_control import AdmissionController, EndpointClass, configured_classes
+
+
+def controller(light_max_concurrent=1):
+    return AdmissionController([
+        EndpointClass('light', priority=0, max_concurrent=light_max_concurrent, max_queue=4, queue_timeout_ms=2000),
+        EndpointClass('heavy', priority=1, max_concurrent=4, max_queue=4, queue_timeout_ms=100),
+    ], max_total=8)
+
+
+def queue_request(admission, name):
+    """Start a request that waits in the class queue; returns the thread and its outcome list"""
+    outcome = []
+    thread = threading.Thread(target=lambda: outcome.append(admission.acquire(name)))
+    thread.start()
+    deadline = time.monotonic() + 2
+    while admission.waiting[name] == 0 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert admission.waiting[name] == 1
+    return thread, outcome
+
+
+def test_full_higher_priority_class_does_not_block_lower_one():
+    admission = controller(light_max_concurrent=1)
+    assert admission.acquire('light') is None
+    thread, outcome = queue_request(admission, 'light')
+
+    # The queued light request cannot run until the first one finishes, so heavy may
+    assert admission.acquire('heavy') is None
+    assert admission.active == {'light': 1, 'heavy': 1}
+
+    admission.release('light', 10)
+    thread.join(timeout=2)
+    assert outcome == [None]
+    admission.release('light', 10)
+    admission.release('heavy', 10)
+
+
+def test_admissible_higher_priority_waiter_goes_first():
+    admission = controller(light_max_concurrent=2)
+    admission.max_total = 1
+    assert admission.acquire('heavy') is None
+    thread, outcome = queue_request(admission, 'light')
+
+    # The light waiter fits its own class, so it is ahead of further heavy requests
+    assert admission.acquire('heavy') == 503
+    admission.release('heavy', 10)
+    thread.join(timeout=2)
+    assert outcome == [None]
+    admission.release('light', 10)
+
+
+def test_per_class_limits_from_config():
+    classes = {c.name: c for c in configured_classes({
+        'ADMISSION_HEAVY_MAX_CONCURRENT': '2',
+        'ADMISSION_BATCH_MAX_QUEUE': 0,
+        'ADMISSION_LIGHT_MAX_CONCURRENT': None,
+    })}
+    assert classes['heavy'].max_concurrent == 2
+    assert classes['batch'].max_queue == 0
+    assert classes['light'].max_concurrent == 8
+    assert classes['light'].priority < classes['heavy'].priority < classes['batch'].priority
+
+
+if __name__ == "__main__":
+    tests = [
+        test_full_higher_priority_class_does_not_block_lower_one,
+        test_admissible_higher_priority_waiter_goes_first,
+        test_per_class_limits_from_config,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -5,6 +5,8 @@ Tests the dataset integration and enhanced prediction features
 
 import requests
 import json
+import time
+import uuid
 
 BASE_URL = "http://localhost:5001"
 
@@ -166,6 +168,50 @@ def test_standard_prediction():
         print(f"❌ Error: {e}")
         return False
 
+def test_patient_history():
+    """Test that predictions with a PatientID are stored and returned as history"""
+    print("\n" + "="*60)
+    print("TEST 5: Patient Prediction History")
+    print("="*60)
+
+    # A fresh PatientID per run, so rows stored by earlier runs cannot satisfy the check
+    patient_id = f"test-history-{uuid.uuid4().hex[:12]}"
+    posted_mmse = [28, 25]
+    try:
+        for mmse in posted_mmse:
+            response = requests.post(
+                f"{BASE_URL}/predict",
+                json={"PatientID": patient_id, "age": 72, "gender": 1, "education": 14,
+                      "apoe4": 0, "mmse": mmse, "cdr": 0},
+                headers={'Content-Type': 'application/json'}
+            )
+            if response.status_code != 200:
+                print(f"❌ Prediction failed: {response.status_code}")
+                return False
+
+        # Writes are batched in the background; poll until both rows are visible
+        deadline = time.monotonic() + 10
+        while True:
+            response = requests.get(f"{BASE_URL}/patients/{patient_id}/history")
+            if response.status_code != 200:
+                print(f"❌ HTTP Error: {response.status_code}")
+                print(f"Response: {response.text}")
+                return False
+            data = response.json()
+            if data['count'] >= len(posted_mmse) or time.monotonic() > deadline:
+                break
+            time.sleep(0.1)
+        print(f"Status Code: {response.status_code}")
+
+        stored_mmse = [(entry.get('input_data') or {}).get('mmse') for entry in data['history']]
+        print(f"Stored predictions: {data['count']} (MMSE {stored_mmse})")
+        print(f"Trend: {data['trend'].get('probabilities')}")
+        return data.get('success', False) and stored_mmse == posted_mmse
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
 if __name__ == "__main__":
     print("\n" + "="*60)
     print("ENHANCED ALZHEIMER'S PREDICTION API - TEST SUITE")
@@ -182,6 +228,7 @@ if __name__ == "__main__":
     results.append(("Dataset Info", test_dataset_info()))
     results.append(("Enhanced Prediction", test_enhanced_prediction()))
     results.append(("Standard Prediction", test_standard_prediction()))
+    results.append(("Patient History", test_patient_history()))
     
     # Summary
     print("\n" + "="*60)
@@ -0,0 +1,57 @@
+"""
+Tests for ensemble: a member that always overruns the deadline must not starve the others.
+Run with pytest or directly: python test_ensemble.py
+"""
+import time
+
+import numpy as np
+
+from ensemble import EnsembleModel
+
+
+class SleepyModel:
+    """Stand-in predictor that takes a fixed time and returns a constant probability"""
+
+    def __init__(self, seconds, proba):
+        self.seconds = seconds
+        self.proba = proba
+
+    def predict_proba(self, X):
+        time.sleep(self.seconds)
+        return np.tile([1 - self.proba, self.proba], (len(X), 1))
+
+
+def test_slow_member_does_not_starve_fast_member():
+    ensemble = EnsembleModel([('fast', SleepyModel(0.001, 0.2), 0.5),
+                              ('slow', SleepyModel(1.0, 0.9), 0.5)], timeout_ms=100)
+    X = np.zeros((1, 3))
+    outcomes = []
+    for _ in range(8):
+        proba, info = ensemble.predict_proba_with_info(X)
+        assert info["members"]["fast"]["status"] == "ok"
+        assert info["members"]["slow"]["status"] == "timeout"
+        outcomes.append(float(proba[0, 1]))
+        time.sleep(0.02)
+    # Every request is answered by the fast member alone
+    np.testing.assert_allclose(outcomes, 0.2)
+    # Only the slow member's own workers were ever tied up; later requests skipped it
+    assert ensemble.in_flight["slow"] <= ensemble.member_workers
+    assert ensemble.metrics()["members"]["slow"]["timeouts"] == 8
+
+
+def test_without_deadline_every_member_is_awaited():
+    ensemble = EnsembleModel([('a', SleepyModel(0.05, 0.2), 1.0),
+                              ('b', SleepyModel(0.05, 0.6), 1.0)], member_workers=1)
+    proba, info = ensemble.predict_proba_with_info(np.zeros((2, 3)), timeout_ms=0)
+    np.testing.assert_allclose(proba[:, 1], 0.4)
+    assert not info["degraded"]
+
+
+if __name__ == "__main__":
+    tests = [
+        test_slow_member_does_not_starve_fast_member,
+        test_without_deadline_every_member_is_awaited,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,111 @@
+"""
+Tests for fused_scaler: the fused transform must match calling the fitted scalers'
+transform() one after another, and batches that do not match the scalers are rejected.
+Run with pytest or directly: python test_fused_scaler.py
+"""
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MaxAbsScaler, MinMaxScaler, RobustScaler, StandardScaler
+
+from fused_scaler import AffineTransform, ScalingError
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alzheimers_disease_data.csv')
+COLUMNS = ['Age', 'EducationLevel', 'MMSE', 'FunctionalAssessment', 'ADL']
+
+
+def training_frame():
+    return pd.read_csv(DATASET_PATH)[COLUMNS].astype(np.float64)
+
+
+def sequential(scalers, X):
+    for scaler in scalers:
+        X = scaler.transform(X)
+    return np.asarray(X, dtype=np.float64)
+
+
+def fit_chain(X, chain):
+    """Fit each scaler on the previous one's output, as a training pipeline would"""
+    fitted = []
+    for scaler in chain:
+        scaler.fit(X)
+        X = scaler.transform(X)
+        fitted.append(scaler)
+    return fitted
+
+
+def test_fused_matches_sequential_transform():
+    """Every fusable scaler type, alone and chained, against sklearn's transform()"""
+    X = training_frame()
+    batch = X.sample(200, random_state=0)
+    chains = [
+        [StandardScaler()],
+        [MinMaxScaler()],
+        [MaxAbsScaler()],
+        [RobustScaler()],
+        [StandardScaler(), MinMaxScaler()],
+        [RobustScaler(), MaxAbsScaler(), StandardScaler(with_mean=False)],
+        [StandardScaler(), MinMaxScaler(clip=True)],
+    ]
+    for chain in chains:
+        scalers = fit_chain(X, chain)
+        fused = AffineTransform.from_scalers(scalers).transform_frame(batch)
+        expected = sequential(scalers, batch)
+        np.testing.assert_allclose(fused.to_numpy(), expected, rtol=1e-12, atol=1e-12,
+                                   err_msg=str([type(s).__name__ for s in chain]))
+
+
+def test_request_keys_resolve_to_scaler_features():
+    """Lowercase API keys and aliases (mmse, education) are scaled like the training columns"""
+    X = training_frame()[['Age', 'EducationLevel', 'MMSE']]
+    scalers = fit_chain(X, [StandardScaler(), MinMaxScaler()])
+    fused = AffineTransform.from_scalers(scalers)
+
+    request = pd.DataFrame([{'mmse': 24.0, 'age': 75.0, 'education': 2.0, 'cdr': 0.5}])
+    out = fused.transform_frame(request)
+
+    assert list(out.columns) == ['mmse', 'age', 'education', 'cdr']
+    expected = sequential(scalers, pd.DataFrame([[75.0, 2.0, 24.0]], columns=['Age', 'EducationLevel', 'MMSE']))
+    np.testing.assert_allclose(out[['age', 'education', 'mmse']].to_numpy(), expected, rtol=1e-12)
+    # Unknown columns pass through untouched
+    assert out['cdr'].iloc[0] == 0.5
+
+
+def test_missing_scaled_features_are_rejected():
+    scalers = fit_chain(training_frame(), [StandardScaler()])
+    fused = AffineTransform.from_scalers(scalers)
+    try:
+        fused.transform_frame(pd.DataFrame([{'age': 75, 'mmse': 24}]))
+    except ScalingError as e:
+        assert 'FunctionalAssessment' in str(e)
+    else:
+        raise AssertionError("batch without the scaled features was accepted")
+
+
+def test_unnamed_scalers_require_matching_width():
+    scalers = fit_chain(training_frame().to_numpy(), [MinMaxScaler()])
+    fused = AffineTransform.from_scalers(scalers)
+    assert fused.feature_names is None
+    try:
+        fused.transform_frame(pd.DataFrame([{'age': 75, 'mmse': 24}]))
+    except ScalingError as e:
+        assert 'expect 5 features' in str(e)
+    else:
+        raise AssertionError("batch of the wrong width was accepted")
+
+    batch = training_frame().head(10)
+    np.testing.assert_allclose(fused.transform_frame(batch).to_numpy(),
+                               sequential(scalers, batch.to_numpy()), rtol=1e-12)
+
+
+if __name__ == "__main__":
+    tests = [
+        test_fused_matches_sequential_transform,
+        test_request_keys_resolve_to_scaler_features,
+        test_missing_scaled_features_are_rejected,
+        test_unnamed_scalers_require_matching_width,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,75 @@
+"""
+Tests for streaming_stats: chunked, multi-process statistics must match pandas on the whole
+frame, and merging partials must not depend on the order the chunks are combined in.
+Run with pytest or directly: python test_streaming_stats.py
+"""
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from streaming_stats import DatasetStats, compute_stats
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alzheimers_disease_data.csv')
+
+
+def assert_describe_matches(summary, df, quantile_rtol):
+    expected = df.describe()
+    for column, stats in summary["basic_stats"].items():
+        for key in ("count", "mean", "std", "min", "max"):
+            assert math.isclose(stats[key], expected[column][key], rel_tol=1e-9, abs_tol=1e-9), (column, key)
+        for key in ("25%", "50%", "75%"):
+            assert math.isclose(stats[key], expected[column][key], rel_tol=quantile_rtol, abs_tol=1e-9), \
+                (column, key, stats[key], expected[column][key])
+
+
+def test_chunked_parallel_stats_match_pandas():
+    df = pd.read_csv(DATASET_PATH)
+    summary = compute_stats(DATASET_PATH, chunksize=300, workers=3).summary()
+
+    assert summary["total_rows"] == len(df)
+    assert summary["columns"] == list(df.columns)
+    assert summary["missing_values"] == {c: int(n) for c, n in df.isnull().sum().items()}
+    assert set(summary["basic_stats"]) == set(df.describe().columns)
+    # High-cardinality columns (PatientID, BMI, ...) fall back to the 1% quantile sketch
+    assert_describe_matches(summary, df, quantile_rtol=0.01)
+    assert summary["value_distributions"]["Gender"] == {int(v): int(c) for v, c in df["Gender"].value_counts().items()}
+
+
+def test_quantiles_exact_while_value_counts_are_complete():
+    df = pd.read_csv(DATASET_PATH)
+    summary = compute_stats(DATASET_PATH, chunksize=300, workers=3, max_distinct=len(df)).summary()
+    assert_describe_matches(summary, df, quantile_rtol=1e-9)
+
+
+def test_merge_is_order_independent():
+    df = pd.read_csv(DATASET_PATH)
+    partials = [DatasetStats(max_distinct=100).update(df.iloc[i:i + 250]) for i in range(0, len(df), 250)]
+
+    def merged(order):
+        total = DatasetStats(max_distinct=100)
+        for i in order:
+            total.merge(partials[i])
+        return total.summary()
+
+    forward = merged(range(len(partials)))
+    shuffled = merged(np.random.default_rng(0).permutation(len(partials)))
+    assert forward["total_rows"] == shuffled["total_rows"] == len(df)
+    assert forward["missing_values"] == shuffled["missing_values"]
+    assert forward["data_types"] == shuffled["data_types"]
+    assert forward["value_distributions"] == shuffled["value_distributions"]
+    for column, stats in forward["basic_stats"].items():
+        for key, value in stats.items():
+            assert math.isclose(value, shuffled["basic_stats"][column][key], rel_tol=1e-9, abs_tol=1e-9), (column, key)
+
+
+if __name__ == "__main__":
+    tests = [
+        test_chunked_parallel_stats_match_pandas,
+        test_quantiles_exact_while_value_counts_are_complete,
+        test_merge_is_order_independent,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,110 @@
+"""
+Tests for wire_format's typed-columns decoder: round trips, and malformed headers that
+must be rejected with WireFormatError (a 400 from /predict-batch) rather than scored.
+Run with pytest or directly: python test_wire_format.py
+"""
+import json
+
+import numpy as np
+
+from wire_format import PREFIX, MAGIC, VERSION, WireFormatError, decode_columns, encode_columns
+
+
+def payload(header, data):
+    """Typed-columns bytes with a hand-written header (no validation on the way out)"""
+    raw = json.dumps(header).encode('utf-8')
+    pad = (-(PREFIX.size + len(raw))) % 8
+    return PREFIX.pack(MAGIC, VERSION, len(raw)) + raw + b'\0' * pad + data
+
+
+def assert_rejected(body, message):
+    try:
+        decode_columns(body)
+    except WireFormatError as e:
+        assert message in str(e), str(e)
+    else:
+        raise AssertionError(f"payload accepted; expected: {message}")
+
+
+def two_columns():
+    age = np.array([70.0, 75.0, 80.0])
+    mmse = np.array([28.0, 24.0, 20.0])
+    return age, mmse, age.tobytes() + mmse.tobytes()
+
+
+def test_round_trip():
+    columns = {"age": np.array([70.0, 81.5]), "apoe4": np.array([0, 2], dtype=np.int8)}
+    decoded = decode_columns(encode_columns(columns))
+    for name, values in columns.items():
+        np.testing.assert_array_equal(decoded[name], values)
+        assert decoded[name].dtype == values.dtype
+
+
+def test_negative_offset_is_rejected():
+    # -8 would point the column back into the header JSON
+    age, _, data = two_columns()
+    body = payload({"rows": 3, "columns": [{"name": "age", "dtype": "<f8", "offset": -8, "nbytes": 24}]}, data)
+    assert_rejected(body, "non-negative multiple of 8")
+
+
+def test_unaligned_offset_is_rejected():
+    _, _, data = two_columns()
+    body = payload({"rows": 2, "columns": [{"name": "age", "dtype": "<f8", "offset": 4, "nbytes": 16}]}, data)
+    assert_rejected(body, "non-negative multiple of 8")
+
+
+def test_missing_keys_are_rejected():
+    _, _, data = two_columns()
+    for missing in ("offset", "nbytes"):
+        entry = {"name": "age", "dtype": "<f8", "offset": 0, "nbytes": 24}
+        del entry[missing]
+        assert_rejected(payload({"rows": 3, "columns": [entry]}, data), f"integer '{missing}'")
+    assert_rejected(payload({"rows": 3, "columns": [{"dtype": "<f8", "offset": 0, "nbytes": 24}]}, data),
+                    "string 'name'")
+    assert_rejected(payload({"columns": []}, data), "Invalid header")
+
+
+def test_bad_rows_are_rejected():
+    _, _, data = two_columns()
+    for rows in (-1, 1.5, "3", True):
+        assert_rejected(payload({"rows": rows, "columns": []}, data), "non-negative integer")
+
+
+def test_overlapping_columns_are_rejected():
+    _, _, data = two_columns()
+    body = payload({"rows": 3, "columns": [
+        {"name": "age", "dtype": "<f8", "offset": 0, "nbytes": 24},
+        {"name": "mmse", "dtype": "<f8", "offset": 16, "nbytes": 24},
+    ]}, data)
+    assert_rejected(body, "overlaps")
+
+
+def test_duplicate_names_and_truncated_buffers_are_rejected():
+    _, _, data = two_columns()
+    body = payload({"rows": 3, "columns": [
+        {"name": "age", "dtype": "<f8", "offset": 0, "nbytes": 24},
+        {"name": "age", "dtype": "<f8", "offset": 24, "nbytes": 24},
+    ]}, data)
+    assert_rejected(body, "appears twice")
+    body = payload({"rows": 3, "columns": [{"name": "age", "dtype": "<f8", "offset": 32, "nbytes": 24}]}, data)
+    assert_rejected(body, "declared row count")
+
+
+def test_header_length_beyond_payload_is_rejected():
+    assert_rejected(PREFIX.pack(MAGIC, VERSION, 1 << 20) + b'{}', "exceeds the payload")
+
+
+if __name__ == "__main__":
+    tests = [
+        test_round_trip,
+        test_negative_offset_is_rejected,
+        test_unaligned_offset_is_rejected,
+        test_missing_keys_are_rejected,
+        test_bad_rows_are_rejected,
+        test_overlapping_columns_are_rejected,
+        test_duplicate_names_and_truncated_buffers_are_rejected,
+        test_header_length_beyond_payload_is_rejected,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -9,22 +9,15 @@ import sys
 import os
 import joblib
 
+from model_resources import discover_model_path
+
 def find_model_path(arg_path=None):
     if arg_path:
         return arg_path
     env = os.environ.get('MODEL_PATH')
     if env:
         return env
-    candidate = os.path.join(os.path.dirname(__file__), 'test_models', 'catboost_alzheimers_model.pkl')
-    if os.path.exists(candidate):
-        return candidate
-    # search
-    for d in [os.path.join(os.path.dirname(__file__), 'test_models'), os.path.dirname(__file__)]:
-        if os.path.isdir(d):
-            for f in os.listdir(d):
-                if f.lower().endswith('.pkl'):
-                    return os.path.join(d, f)
-    return None
+    return discover_model_path()
 
 
 def validate(path):
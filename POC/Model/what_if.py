@@ -0,0 +1,167 @@
+"""
+What-if sensitivity sweeps for one patient.
+One or two features are varied over ranges while the rest of the patient stays fixed.
+The whole perturbation grid is built column-wise as one frame (the patient's own row
+first) and scored with a single batched predict_proba. Curves and surfaces come back with
+the risk-band boundaries marked: the band of every grid point and the interpolated
+feature values where the risk crosses each boundary.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_STEPS = 21
+MAX_SWEEPS = 2
+
+
+def _sweep_values(spec, features):
+    """Grid values for one sweep spec: explicit values, min/max/steps, or deltas from the patient"""
+    name = spec.get('feature')
+    if 'values' in spec:
+        values = np.asarray(spec['values'], dtype=np.float64)
+    elif 'deltas' in spec:
+        if name not in features:
+            raise ValueError(f"'deltas' needs the patient's current '{name}'")
+        values = float(features[name]) + np.asarray(spec['deltas'], dtype=np.float64)
+    elif 'min' in spec and 'max' in spec:
+        steps = int(spec.get('steps', DEFAULT_STEPS))
+        if steps < 2:
+            raise ValueError("'steps' must be at least 2")
+        values = np.linspace(float(spec['min']), float(spec['max']), steps)
+    else:
+        raise ValueError(f"Sweep for '{name}' needs 'values', 'deltas' or 'min'/'max'")
+    if values.ndim != 1 or not len(values) or not np.isfinite(values).all():
+        raise ValueError(f"Sweep for '{name}' has no usable values")
+    return values
+
+
+def parse_sweeps(specs, features, known_features=None, max_points=10000):
+    """[(feature, values)] for 1-2 sweep specs, validated against the patient and grid size"""
+    if isinstance(specs, dict):
+        specs = [specs]
+    if not isinstance(specs, list) or not 1 <= len(specs) <= MAX_SWEEPS:
+        raise ValueError(f"Provide 1 to {MAX_SWEEPS} sweeps")
+    sweeps = []
+    for spec in specs:
+        name = spec.get('feature') if isinstance(spec, dict) else None
+        if not name:
+            raise ValueError("Each sweep needs a 'feature'")
+        if name not in features and (known_features is None or name not in known_features):
+            raise ValueError(f"Unknown feature '{name}'")
+        if any(name == other for other, _ in sweeps):
+            raise ValueError(f"Feature '{name}' is swept twice")
+        sweeps.append((name, _sweep_values(spec, features)))
+    points = int(np.prod([len(values) for _, values in sweeps]))
+    if points > max_points:
+        raise ValueError(f"Grid has {points} points; the limit is {max_points}")
+    return sweeps
+
+
+def build_grid(features, sweeps):
+    """Frame with the unchanged patient as row 0 followed by every grid point (first sweep varies slowest)"""
+    axes = np.meshgrid(*[values for _, values in sweeps], indexing='ij')
+    columns = dict(features)
+    for (name, _), axis in zip(sweeps, axes):
+        current = features.get(name, np.nan)
+        columns[name] = np.concatenate([[current], axis.ravel()])
+    # Scalars broadcast against the swept columns, so no per-row objects are built
+    return pd.DataFrame(columns, index=pd.RangeIndex(1 + axes[0].size))
+
+
+def band_index(proba, thresholds):
+    """Band of each probability: 0 below the first threshold, len(thresholds) above the last"""
+    return np.searchsorted(np.asarray(thresholds), proba, side='left')
+
+
+def crossings(values, proba, threshold):
+    """Feature values (linearly interpolated) where a curve crosses threshold, with direction"""
+    above = proba > threshold
+    idx = np.flatnonzero(above[:-1] != above[1:])
+    p0, p1 = proba[idx], proba[idx + 1]
+    x0, x1 = values[idx], values[idx + 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(p1 != p0, (threshold - p0) / (p1 - p0), 1.0)
+    x = x0 + t * (x1 - x0)
+    return [{"value": float(v), "direction": "up" if up else "down"} for v, up in zip(x, above[idx + 1])]
+
+
+def first_crossings(values, surface, threshold):
+    """For each row of a surface, the first interpolated column value where it crosses threshold (None if never)"""
+    if surface.shape[1] < 2:
+        # A single column value cannot cross anything
+        return [None] * len(surface)
+    above = surface > threshold
+    changes = above[:, :-1] != above[:, 1:]
+    has = changes.any(axis=1)
+    j = changes.argmax(axis=1)
+    rows = np.arange(len(surface))
+    p0, p1 = surface[rows, j], surface[rows, j + 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(p1 != p0, (threshold - p0) / (p1 - p0), 1.0)
+    x = values[j] + t * (values[j + 1] - values[j])
+    return [float(v) if ok else None for v, ok in zip(x, has)]
+
+
+def sweep_result(sweeps, proba, bands):
+    """
+    Curve (one sweep) or surface (two sweeps) for the grid probabilities (row 0 excluded).
+    bands: [(category, lower threshold or None)] from lowest to highest risk.
+    """
+    thresholds = [lower for _, lower in bands if lower is not None]
+    result = {
+        "features": [name for name, _ in sweeps],
+        "values": [values.tolist() for _, values in sweeps],
+    }
+    if len(sweeps) == 1:
+        values = sweeps[0][1]
+        result["probabilities"] = proba.tolist()
+        result["band_index"] = band_index(proba, thresholds).tolist()
+        result["boundary_crossings"] = [
+            {"threshold": t, "category": bands[i + 1][0], "crossings": crossings(values, proba, t)}
+            for i, t in enumerate(thresholds)
+        ]
+        return result
+
+    surface = proba.reshape(len(sweeps[0][1]), len(sweeps[1][1]))
+    result["probabilities"] = surface.tolist()
+    result["band_index"] = band_index(surface, thresholds).tolist()
+    # Boundary contours: per value of the first feature, where the second feature crosses each threshold
+    result["boundary_crossings"] = [
+        {"threshold": t, "category": bands[i + 1][0], "crossings": first_crossings(sweeps[1][1], surface, t)}
+        for i, t in enumerate(thresholds)
+    ]
+    return result
+
+
+class ResultCache:
+    """Thread-safe LRU of computed responses"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def metrics(self):
+        with self.lock:
+            return {"entries": len(self.entries), "max_entries": self.max_entries,
+                    "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,181 @@
+"""
+Columnar wire formats for batch prediction traffic, chosen by content negotiation.
+
+  application/json                    default; {"columns": {...}} or {"rows": [...]}
+  application/x-typed-columns         built-in binary layout (below), numpy only
+  application/vnd.apache.arrow.stream Arrow IPC stream, when pyarrow is installed
+
+Typed columns layout (all integers little-endian):
+  b'TCOL' | uint32 version (1) | uint32 header length | header JSON (UTF-8)
+  | zero padding to 8 bytes | column buffers, each starting on an 8-byte boundary
+Header: {"rows": n, "columns": [{"name": "age", "dtype": "<f8", "offset": 0, "nbytes": 8n}, ...]}
+with offsets relative to the first column buffer. Offsets must be non-negative multiples of 8,
+buffers may not overlap and each must hold exactly `rows` values; any other header is rejected
+with WireFormatError before a buffer is read. Buffers are decoded with
+np.frombuffer, so a batch becomes the model's feature frame without per-row Python objects.
+From Node, each column is a Float64Array (dtype "<f8") written with Buffer.concat.
+"""
+import json
+import struct
+
+import numpy as np
+import pandas as pd
+
+MEDIA_JSON = 'application/json'
+MEDIA_TYPED_COLUMNS = 'application/x-typed-columns'
+MEDIA_ARROW = 'application/vnd.apache.arrow.stream'
+
+MAGIC = b'TCOL'
+VERSION = 1
+PREFIX = struct.Struct('<4sII')
+ALIGNMENT = 8
+ALLOWED_DTYPES = {'<f8', '<f4', '<i8', '<i4', '<i2', '|i1', '|u1', '|b1'}
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+class WireFormatError(ValueError):
+    """Malformed or unsupported batch payload"""
+
+
+def supported_media_types():
+    """Media types this process can read and write, JSON first (the default)"""
+    types = [MEDIA_JSON, MEDIA_TYPED_COLUMNS]
+    if pa is not None:
+        types.append(MEDIA_ARROW)
+    return types
+
+
+def _pad(n):
+    return (-n) % ALIGNMENT
+
+
+def encode_columns(columns):
+    """Typed-columns bytes for {name: 1-D numeric array}, all of the same length"""
+    arrays = {name: np.ascontiguousarray(values) for name, values in columns.items()}
+    lengths = {len(a) for a in arrays.values()}
+    if len(lengths) > 1:
+        raise WireFormatError("All columns must have the same length")
+    rows = lengths.pop() if lengths else 0
+
+    entries, offset = [], 0
+    for name, a in arrays.items():
+        if a.dtype.byteorder == '>':
+            a = arrays[name] = a.astype(a.dtype.newbyteorder('<'))
+        if a.dtype.str not in ALLOWED_DTYPES:
+            raise WireFormatError(f"Column '{name}' has unsupported dtype {a.dtype}")
+        entries.append({"name": name, "dtype": a.dtype.str, "offset": offset, "nbytes": a.nbytes})
+        offset += a.nbytes + _pad(a.nbytes)
+
+    header = json.dumps({"rows": rows, "columns": entries}, separators=(',', ':')).encode('utf-8')
+    parts = [PREFIX.pack(MAGIC, VERSION, len(header)), header, b'\0' * _pad(PREFIX.size + len(header))]
+    for a in arrays.values():
+        parts.append(a.tobytes())
+        parts.append(b'\0' * _pad(a.nbytes))
+    return b''.join(parts)
+
+
+def _header_int(entry, key, name):
+    value = entry.get(key)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise WireFormatError(f"Column '{name}' needs an integer '{key}'")
+    return value
+
+
+def decode_columns(body):
+    """{name: read-only array view into body} from typed-columns bytes"""
+    if len(body) < PREFIX.size:
+        raise WireFormatError("Payload too short")
+    magic, version, header_len = PREFIX.unpack_from(body)
+    if magic != MAGIC or version != VERSION:
+        raise WireFormatError("Not a typed-columns payload (bad magic or version)")
+    if PREFIX.size + header_len > len(body):
+        raise WireFormatError("Header length exceeds the payload")
+    try:
+        header = json.loads(bytes(body[PREFIX.size:PREFIX.size + header_len]))
+        rows = header["rows"]
+        entries = header["columns"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise WireFormatError(f"Invalid header: {e}")
+    if isinstance(rows, bool) or not isinstance(rows, int) or rows < 0:
+        raise WireFormatError("Header 'rows' must be a non-negative integer")
+    if not isinstance(entries, list):
+        raise WireFormatError("Header 'columns' must be a list")
+
+    # Validate every entry before viewing any buffer: offsets must be aligned, inside the
+    # data section and non-overlapping, and each buffer must hold exactly `rows` values
+    data_start = PREFIX.size + header_len + _pad(PREFIX.size + header_len)
+    ranges = []
+    for entry in entries:
+        if not isinstance(entry, dict) or not isinstance(entry.get("name"), str):
+            raise WireFormatError("Each column needs a string 'name'")
+        name = entry["name"]
+        if any(name == other for other, _, _, _ in ranges):
+            raise WireFormatError(f"Column '{name}' appears twice")
+        dtype = np.dtype(entry["dtype"]) if entry.get("dtype") in ALLOWED_DTYPES else None
+        if dtype is None:
+            raise WireFormatError(f"Column '{name}' has unsupported dtype {entry.get('dtype')}")
+        offset = _header_int(entry, "offset", name)
+        nbytes = _header_int(entry, "nbytes", name)
+        if offset < 0 or offset % ALIGNMENT:
+            raise WireFormatError(f"Column '{name}' offset must be a non-negative multiple of {ALIGNMENT}")
+        if nbytes != rows * dtype.itemsize or data_start + offset + nbytes > len(body):
+            raise WireFormatError(f"Column '{name}' does not match the declared row count")
+        ranges.append((name, dtype, offset, nbytes))
+
+    previous_end, previous_name = 0, None
+    for name, _, offset, nbytes in sorted(ranges, key=lambda r: r[2]):
+        if nbytes and offset < previous_end:
+            raise WireFormatError(f"Column '{name}' overlaps column '{previous_name}'")
+        if nbytes:
+            previous_end, previous_name = offset + nbytes, name
+
+    return {
+        name: np.frombuffer(body, dtype=dtype, count=rows, offset=data_start + offset)
+        for name, dtype, offset, _ in ranges
+    }
+
+
+def decode_batch(body, content_type):
+    """Feature frame for a batch request body of the given media type"""
+    media_type = (content_type or MEDIA_JSON).split(';')[0].strip().lower()
+    if media_type == MEDIA_TYPED_COLUMNS:
+        return pd.DataFrame(decode_columns(body), copy=False)
+    if media_type == MEDIA_ARROW and pa is not None:
+        try:
+            return pa.ipc.open_stream(body).read_all().to_pandas()
+        except pa.ArrowInvalid as e:
+            raise WireFormatError(f"Invalid Arrow stream: {e}")
+    if media_type == MEDIA_JSON:
+        try:
+            data = json.loads(body or b'null')
+        except ValueError as e:
+            raise WireFormatError(f"Invalid JSON: {e}")
+        if isinstance(data, dict) and isinstance(data.get('columns'), dict):
+            return pd.DataFrame(data['columns'])
+        if isinstance(data, dict) and isinstance(data.get('rows'), list):
+            return pd.DataFrame(data['rows'])
+        if isinstance(data, list):
+            return pd.DataFrame(data)
+        raise WireFormatError('Expected {"columns": {...}}, {"rows": [...]} or a list of rows')
+    raise WireFormatError(f"Unsupported content type: {content_type}")
+
+
+def encode_batch(columns, media_type):
+    """Response body for {name: array} in the negotiated media type"""
+    if media_type == MEDIA_TYPED_COLUMNS:
+        return encode_columns(columns)
+    if media_type == MEDIA_ARROW and pa is not None:
+        table = pa.table({name: np.asarray(values) for name, values in columns.items()})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    return json.dumps({
+        "success": True,
+        "count": len(next(iter(columns.values()))) if columns else 0,
+        "columns": {name: np.asarray(values).tolist() for name, values in columns.items()},
+    }).encode('utf-8')